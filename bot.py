@@ -2,6 +2,7 @@ import os
 import re
 import json
 import httpx
+import orjson
 import asyncio
 import logging
 import socket
@@ -13,6 +14,7 @@ import time
 import check_host
 import copy
 import io
+from functools import lru_cache, wraps
 from zoneinfo import ZoneInfo
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
@@ -26,7 +28,15 @@ from helpers import (
     get_text, get_user_lang, load_config, save_config,
     send_or_edit, escape_html, send_notification
 )
-HTTP_CLIENT = httpx.AsyncClient(timeout=20.0)
+# Fail fast on unreachable APIs; allow slower reads for large record listings.
+HTTP_CLIENT = httpx.AsyncClient(
+    timeout=httpx.Timeout(20.0, connect=5.0),
+    transport=httpx.AsyncHTTPTransport(
+        http2=True,
+        retries=3,
+        limits=httpx.Limits(max_connections=32, max_keepalive_connections=16, keepalive_expiry=60.0),
+    ),
+)
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 LOG_FILE = os.path.join(SCRIPT_DIR, "monitoring_log.json")
@@ -268,32 +278,31 @@ DNS_RECORD_TYPES = [
 RECORDS_PER_PAGE = 5
 ZONES_PER_PAGE = 10
 
-translations = {}
-def load_translations():
-    global translations
-    for lang in ['en', 'fa']:
-        try:
-            with open(f'{lang}.json', 'r', encoding='utf-8') as f:
-                translations[lang] = json.load(f)
-        except FileNotFoundError:
-            logger.fatal(f"Translation file {lang}.json not found! Please create it.")
-            exit(1)
-        except json.JSONDecodeError:
-            logger.fatal(f"Could not decode {lang}.json. Please check its syntax.")
-            exit(1)
+LANGUAGE_PICKER_MARKUP = InlineKeyboardMarkup([[
+    InlineKeyboardButton("🇮🇷 فارسی", callback_data="set_lang|fa"),
+    InlineKeyboardButton("🇬🇧 English", callback_data="set_lang|en")
+]])
 
-def get_text(key: str, lang: str, **kwargs):
-    try:
-        keys = key.split('.')
-        text_template = translations.get(lang, translations.get('en', {}))
-        for k in keys:
-            text_template = text_template[k]
-        return text_template.format(**kwargs)
-    except (KeyError, AttributeError):
-        return f"Untranslated key: {key}"
+IP_RECORD_TYPES = frozenset({"A", "AAAA"})
 
-def get_user_lang(context: ContextTypes.DEFAULT_TYPE):
-    return context.user_data.get('language', 'fa')
+PROXY_ON_ICON, PROXY_OFF_ICON = "☁️", "⬜️"
+CHECK_ON_ICON, CHECK_OFF_ICON = "✅", "▫️"
+
+DNS_BULK_CONCURRENCY = max(1, int(os.getenv("DNS_BULK_CONCURRENCY", "8")))
+_DNS_BULK_SEMAPHORE = asyncio.Semaphore(DNS_BULK_CONCURRENCY)
+# Page fetches and the background refresh get their own limiters: they run inside tasks that may already hold a
+# bulk permit (failover switches, the refresh job itself), and waiting on the same semaphore there can deadlock.
+_DNS_PAGE_SEMAPHORE = asyncio.Semaphore(DNS_BULK_CONCURRENCY)
+_DNS_REFRESH_SEMAPHORE = asyncio.Semaphore(2)
+# How many updates the application processes at once; 1 restores strictly sequential handling.
+CONCURRENT_UPDATES = max(1, int(os.getenv("CONCURRENT_UPDATES", "16")))
+
+# Setting WEBHOOK_URL (the public https base URL) switches from long polling to a webhook.
+WEBHOOK_URL = os.getenv("WEBHOOK_URL", "").rstrip("/")
+WEBHOOK_LISTEN = os.getenv("WEBHOOK_LISTEN", "0.0.0.0")
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8443"))
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "telegram").strip("/")
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET") or None
 
 def get_flag_emoji(country_code: str) -> str:
     if not country_code or len(country_code) != 2:
@@ -659,12 +668,10 @@ async def clear_zone_cache_for_all_users(persistence: PicklePersistence, zone_id
     for chat_id, data in user_data_copy.items():
         if data.get('selected_zone_id') == zone_id:
             user_dirty = False
-            if 'all_records' in data:
-                del data['all_records']
-                user_dirty = True
-            if 'records_in_view' in data:
-                del data['records_in_view']
-                user_dirty = True
+            for key in ('records_list_cache', 'all_records', 'records', 'all_records_lower', 'records_in_view'):
+                if key in data:
+                    del data[key]
+                    user_dirty = True
 
             if user_dirty:
                 await persistence.update_user_data(chat_id, data)
@@ -683,19 +690,76 @@ async def clear_commands_command(update: Update, context: ContextTypes.DEFAULT_T
         await update.message.reply_text(f"Failed to delete commands: {e}")
         logger.error(f"Failed to delete commands: {e}")
 
+async def refresh_zones_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Drops the cached zone name to zone id mapping so it is re-resolved on next use."""
+    if not is_super_admin(update): return
+    clear_zone_id_cache()
+    await update.message.reply_text("Zone ID cache cleared. Zones will be re-resolved on next use.")
+    logger.info(f"User {update.effective_user.id} cleared the zone ID cache.")
+
+API_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+API_RETRY_METHODS = frozenset({"get", "put", "patch", "delete"})
+API_MAX_RETRIES = 3
+API_TIMEOUT_MESSAGE = "The DNS provider did not respond in time. Please try again."
+API_RETRY_BACKOFF_SECONDS = 0.3
+API_MAX_RETRY_DELAY_SECONDS = 10.0
+
+async def _send_api_request(method: str, url: str, **kwargs) -> httpx.Response:
+    """
+    Sends a request on the shared client, retrying idempotent methods on rate-limit and 5xx responses.
+    Non-idempotent methods (record creation) are retried on 429 only, which the API returns before doing any work.
+    """
+    idempotent = method.lower() in API_RETRY_METHODS
+    for attempt in range(API_MAX_RETRIES + 1):
+        r = await HTTP_CLIENT.request(method, url, **kwargs)
+        retry = r.status_code in API_RETRY_STATUSES if idempotent else r.status_code == 429
+        if not retry or attempt == API_MAX_RETRIES:
+            return r
+        retry_after = r.headers.get("Retry-After", "")
+        # Bulk callers hold a concurrency permit while sleeping, so a large Retry-After must not stall them for minutes.
+        delay = min(float(retry_after) if retry_after.isdigit() else API_RETRY_BACKOFF_SECONDS * (2 ** attempt), API_MAX_RETRY_DELAY_SECONDS)
+        logger.warning(f"API {method.upper()} {url} returned {r.status_code}, retrying in {delay:.1f}s (attempt {attempt + 1}/{API_MAX_RETRIES}).")
+        await asyncio.sleep(delay)
+
+@lru_cache(maxsize=64)
+def cloudflare_headers(token: str) -> dict:
+    """Request headers for one Cloudflare token, built once per token; callers must not mutate them."""
+    return {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+
+@lru_cache(maxsize=64)
+def arvan_headers(token: str) -> dict:
+    """Request headers for one ArvanCloud API key, built once per key; callers must not mutate them."""
+    return {"Authorization": f"APIKEY {token}", "Content-Type": "application/json", "Accept": "application/json"}
+
 async def api_request(token: str, method: str, url: str, **kwargs):
     if not token:
         return {"success": False, "errors": [{"message": "No API token selected."}]}
-    headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+    headers = cloudflare_headers(token)
+    if "json" in kwargs:
+        kwargs["content"] = orjson.dumps(kwargs.pop("json"))
     try:
-        r = await HTTP_CLIENT.request(method, url, headers=headers, **kwargs)
+        r = await _send_api_request(method, url, headers=headers, **kwargs)
         r.raise_for_status()
-        return r.json()
+        return orjson.loads(r.content)
     except httpx.HTTPStatusError as e:
-        try: return e.response.json()
-        except json.JSONDecodeError: return {"success": False, "errors": [{"message": e.response.text or f"HTTP Error: {e.response.status_code}"}]}
+        try: data = orjson.loads(e.response.content)
+        except json.JSONDecodeError: data = None
+        if not isinstance(data, dict):
+            data = {"success": False, "errors": [{"message": e.response.text or f"HTTP Error: {e.response.status_code}"}]}
+        data["status_code"] = e.response.status_code
+        return data
+    except httpx.TimeoutException:
+        logger.warning(f"Cloudflare API {method.upper()} {url} timed out.")
+        return {"success": False, "errors": [{"message": API_TIMEOUT_MESSAGE}]}
     except (httpx.RequestError, json.JSONDecodeError) as e: return {"success": False, "errors": [{"message": str(e)}]}
 
+def get_api_error_message(res: dict, default: str = "Unknown error") -> str:
+    errors = res.get("errors") or [{}]
+    first_error = errors[0] if isinstance(errors[0], dict) else {}
+    return first_error.get("message", default)
+
+_ZONE_ID_CACHE = {}
+
 async def get_all_zones(token: str):
     url = "https://api.cloudflare.com/client/v4/zones"
     all_zones, page = [], 1
@@ -706,51 +770,151 @@ async def get_all_zones(token: str):
         all_zones.extend(data)
         if res.get('result_info', {}).get('page', 1) >= res.get('result_info', {}).get('total_pages', 1): break
         page += 1
+    # Every zone listing warms the name -> id cache used by get_zone_id.
+    _ZONE_ID_CACHE.update({(token, zone['name']): zone['id'] for zone in all_zones})
     return all_zones
 
+async def get_zone_id(token: str, zone_name: str):
+    """Resolves a Cloudflare zone name to its id, fetching the account's zone list only on a cache miss."""
+    cache_key = (token, zone_name)
+    if cache_key not in _ZONE_ID_CACHE:
+        await get_all_zones(token)
+    return _ZONE_ID_CACHE.get(cache_key)
+
+def clear_zone_id_cache():
+    _ZONE_ID_CACHE.clear()
+
+# Responses meaning the zone id itself is unusable: auth failures, not found, and Cloudflare's 7003 "could not route" for an invalid id.
+ZONE_GONE_STATUSES = frozenset({401, 403, 404})
+ZONE_GONE_ERROR_CODES = frozenset({7003})
+
+def zone_id_is_gone(res: dict) -> bool:
+    codes = {e.get("code") for e in res.get("errors") or [] if isinstance(e, dict)}
+    return res.get("status_code") in ZONE_GONE_STATUSES or bool(codes & ZONE_GONE_ERROR_CODES)
+
+def forget_zone_id(zone_id: str):
+    """Drops cached name mappings that point at zone_id, so a deleted or re-added zone is re-resolved on next use."""
+    for key in [k for k, v in _ZONE_ID_CACHE.items() if v == zone_id]:
+        del _ZONE_ID_CACHE[key]
+
+async def warm_zone_id_cache_job(context: ContextTypes.DEFAULT_TYPE):
+    """Lists every Cloudflare account's zones concurrently once after startup, so the first zone lookups hit the cache."""
+    results = await asyncio.gather(*(get_all_zones(token) for token in CF_ACCOUNTS.values()), return_exceptions=True)
+    failed = sum(1 for r in results if isinstance(r, Exception))
+    if failed:
+        logger.warning(f"Zone ID cache warm-up failed for {failed} Cloudflare account(s).")
+    logger.info(f"Zone ID cache warmed with {len(_ZONE_ID_CACHE)} zones.")
+
+CF_DNS_RECORDS_PER_PAGE = 5000
+
 async def get_dns_records(token: str, zone_id: str):
     url = f"https://api.cloudflare.com/client/v4/zones/{zone_id}/dns_records"
-    all_records, page = [], 1
-    while True:
-        res = await api_request(token, "get", url, params={'per_page': 100, 'page': page})
-        if not res.get("success"):
+    res = await api_request(token, "get", url, params={'per_page': CF_DNS_RECORDS_PER_PAGE, 'page': 1})
+    if not res.get("success"):
+        logger.error(f"API request failed for get_dns_records on zone {zone_id}, page 1: {get_api_error_message(res)}")
+        # Timeouts, rate limits and 5xx errors are transient; only a response saying the id is unusable evicts it.
+        if zone_id_is_gone(res):
+            forget_zone_id(zone_id)
+        return []
+    all_records = list(res.get("result", []))
+    total_pages = res.get('result_info', {}).get('total_pages', 1) or 1
+    if total_pages > 100:
+        logger.warning("get_dns_records exceeded 100 pages, truncating.")
+        total_pages = 100
+
+    # The first page reports total_pages, so the rest can be fetched concurrently.
+    pages = await run_bulk_dns_calls(
+        (api_request(token, "get", url, params={'per_page': CF_DNS_RECORDS_PER_PAGE, 'page': page}) for page in range(2, total_pages + 1)),
+        semaphore=_DNS_PAGE_SEMAPHORE
+    )
+    for page, page_res in enumerate(pages, start=2):
+        if not page_res.get("success"):
+            # A partial listing would be cached and acted on as if complete, so fail the whole fetch like page 1 does.
             logger.error(f"API request failed for get_dns_records on zone {zone_id}, page {page}.")
-            break
-        data = res.get("result", [])
-        if not data:
-            break
-        all_records.extend(data)
-        result_info = res.get('result_info', {})
-        if result_info.get('page', 1) >= result_info.get('total_pages', 1):
-            break
-        page += 1
-        if page > 100:
-            logger.warning("get_dns_records exceeded 100 pages, breaking loop.")
-            break
+            return []
+        all_records.extend(page_res.get("result", []))
     return all_records
 
+DNS_RECORDS_CACHE_TTL = max(0, int(os.getenv("DNS_RECORDS_CACHE_TTL", "60")))
+DNS_RECORDS_REFRESH_WINDOW = max(0, int(os.getenv("DNS_RECORDS_REFRESH_WINDOW", "600")))
+_DNS_RECORDS_CACHE = {}
+_DNS_RECORDS_LAST_READ = {}
+_DNS_RECORDS_INVALIDATED_AT = {}
+
+def invalidate_dns_records_cache(zone_identifier):
+    """Drops the shared record listing of a zone; called by every function that changes its records."""
+    _DNS_RECORDS_INVALIDATED_AT[zone_identifier] = time.monotonic()
+    for key in [k for k in _DNS_RECORDS_CACHE if k[2] == zone_identifier]:
+        del _DNS_RECORDS_CACHE[key]
+
+def invalidates_zone_records(func):
+    """
+    Wraps a record-changing call `func(token, zone_identifier, ...)` to drop the zone's shared listing before and after it.
+    Invalidating again once the response is in means a fetch that overlapped the change is never cached.
+    """
+    @wraps(func)
+    async def wrapper(token, zone_identifier, *args, **kwargs):
+        invalidate_dns_records_cache(zone_identifier)
+        try:
+            return await func(token, zone_identifier, *args, **kwargs)
+        finally:
+            invalidate_dns_records_cache(zone_identifier)
+    return wrapper
+
+@invalidates_zone_records
 async def update_record(token: str, zone_id, rid, rtype, name, content, proxied):
     url = f"https://api.cloudflare.com/client/v4/zones/{zone_id}/dns_records/{rid}"
     payload = {"type": rtype, "name": name, "content": content, "ttl": 1, "proxied": proxied}
     return await api_request(token, "put", url, json=payload)
 
+@invalidates_zone_records
+async def patch_record_content(token: str, zone_id, rid, content):
+    """Changes only a record's content, leaving its ttl and proxy state as they are (same as a batch 'patches' item)."""
+    url = f"https://api.cloudflare.com/client/v4/zones/{zone_id}/dns_records/{rid}"
+    return await api_request(token, "patch", url, json={"content": content})
+
+@invalidates_zone_records
 async def delete_record(token: str, zone_id, rid):
     url = f"https://api.cloudflare.com/client/v4/zones/{zone_id}/dns_records/{rid}"
     return await api_request(token, "delete", url)
 
+@invalidates_zone_records
 async def create_record(token: str, zone_id, rtype, name, content, proxied):
     url = f"https://api.cloudflare.com/client/v4/zones/{zone_id}/dns_records"
     payload = {"type": rtype, "name": name, "content": content, "ttl": 1, "proxied": proxied}
     return await api_request(token, "post", url, json=payload)
 
+CF_DNS_BATCH_SIZE = 200
+
+@invalidates_zone_records
+async def cloudflare_batch_dns(token: str, zone_id, operation: str, items: list, fallback) -> int:
+    """
+    Applies a Cloudflare batch DNS operation ("deletes", "patches" or "posts") in chunks of CF_DNS_BATCH_SIZE.
+    Batches are atomic, so a rejected chunk is retried item by item through `fallback(item)`.
+    Returns the number of items that were applied successfully.
+    """
+    url = f"https://api.cloudflare.com/client/v4/zones/{zone_id}/dns_records/batch"
+    success = 0
+    for chunk in chunk_list(items, CF_DNS_BATCH_SIZE):
+        res = await api_request(token, "post", url, json={operation: chunk})
+        if res.get("success"):
+            success += len(chunk)
+            continue
+        logger.warning(f"Batch DNS {operation} of {len(chunk)} records on zone {zone_id} failed ({get_api_error_message(res)}), retrying per record.")
+        results = await run_bulk_dns_calls(fallback(item) for item in chunk)
+        success += sum(1 for r in results if r.get("success"))
+    return success
+
 async def arvan_api_request(token: str, method: str, url: str, **kwargs):
     if not token:
         return {"success": False, "errors": [{"message": "No ArvanCloud API key selected."}]}
-    headers = {"Authorization": f"APIKEY {token}", "Content-Type": "application/json", "Accept": "application/json"}
+    headers = arvan_headers(token)
+    if "json" in kwargs:
+        kwargs["content"] = orjson.dumps(kwargs.pop("json"))
     try:
-        r = await HTTP_CLIENT.request(method, url, headers=headers, **kwargs)
+        r = await _send_api_request(method, url, headers=headers, **kwargs)
         r.raise_for_status()
-        data = r.json() if r.content else {}
+        data = orjson.loads(r.content) if r.content else {}
 
         success = data.get("status") is not False
         if success:
@@ -758,11 +922,14 @@ async def arvan_api_request(token: str, method: str, url: str, **kwargs):
         return data
     except httpx.HTTPStatusError as e:
         try:
-            data = e.response.json()
+            data = orjson.loads(e.response.content)
         except json.JSONDecodeError:
             data = {"message": e.response.text or f"HTTP Error: {e.response.status_code}"}
         message = data.get("message") or data.get("error") or f"HTTP Error: {e.response.status_code}"
         return {"success": False, "status_code": e.response.status_code, "errors": [{"message": message}], "raw": data}
+    except httpx.TimeoutException:
+        logger.warning(f"ArvanCloud API {method.upper()} {url} timed out.")
+        return {"success": False, "errors": [{"message": API_TIMEOUT_MESSAGE}]}
     except (httpx.RequestError, json.JSONDecodeError) as e:
         return {"success": False, "errors": [{"message": str(e)}]}
 
@@ -772,7 +939,7 @@ async def arvan_get_all_domains(token: str):
     while True:
         res = await arvan_api_request(token, "get", url, params={"per_page": 50, "page": page})
         if res.get("success") is False:
-            logger.error(f"Arvan API request failed for domains list: {res.get('errors', [{}])[0].get('message', 'Unknown error')}")
+            logger.error(f"Arvan API request failed for domains list: {get_api_error_message(res)}")
             return []
         data = res.get("data", []) or []
         all_domains.extend(data)
@@ -828,7 +995,7 @@ async def arvan_get_dns_records(token: str, domain: str):
     while True:
         res = await arvan_api_request(token, "get", url, params={"per_page": 100, "page": page})
         if res.get("success") is False:
-            logger.error(f"Arvan API request failed for DNS records on {domain}: {res.get('errors', [{}])[0].get('message', 'Unknown error')}")
+            logger.error(f"Arvan API request failed for DNS records on {domain}: {get_api_error_message(res)}")
             return []
         data = res.get("data", []) or []
         if isinstance(data, dict):
@@ -844,6 +1011,7 @@ async def arvan_get_dns_records(token: str, domain: str):
         page += 1
     return all_records
 
+@invalidates_zone_records
 async def arvan_update_record(token: str, domain: str, record: dict, content: str):
     record_id = record.get("id")
     if not record_id:
@@ -875,10 +1043,67 @@ async def get_provider_zones(provider: str, token: str):
         return [{"id": _arvan_domain_name(d), "name": _arvan_domain_name(d)} for d in domains if _arvan_domain_name(d)]
     return await get_all_zones(token)
 
-async def get_provider_dns_records(provider: str, token: str, zone_identifier: str):
+CACHED_RECORD_FIELDS = ("id", "type", "name", "content", "proxied", "ttl", "provider", "raw")
+
+def slim_dns_records(records: list) -> list:
+    """Keeps only the record fields the bot reads, so per-user caches stay small in memory and in the pickle file."""
+    return [{k: r[k] for k in CACHED_RECORD_FIELDS if k in r} for r in records]
+
+def index_records_by_name(records: list) -> dict:
+    """Maps each record name to the first record with that name, replacing per-name scans of the list."""
+    by_name = {}
+    for r in records:
+        by_name.setdefault(r['name'], r)
+    return by_name
+
+def _set_all_records(context: ContextTypes.DEFAULT_TYPE, records: list, fetched: bool = False):
+    """
+    Stores the zone's record list with its id index and case-folded name index, built once per listing.
+    `fetched=True` also refreshes records_list_cache so display_records_list serves this listing instead of an older one.
+    """
+    if fetched:
+        context.user_data['records_list_cache'] = {'data': records, 'timestamp': datetime.now()}
+    context.user_data['all_records'] = records
+    context.user_data['records'] = {r['id']: r for r in records}
+    context.user_data['all_records_lower'] = [str(r.get('name', '')).casefold() for r in records]
+
+async def get_provider_dns_records(provider: str, token: str, zone_identifier: str, use_cache: bool = True, track_activity: bool = False):
+    """
+    Lists a zone's records, reusing a listing younger than DNS_RECORDS_CACHE_TTL seconds.
+    Pass use_cache=False where the result must reflect the provider exactly (backup/restore, failover and health checks).
+    Returns copies of the record dicts, so callers may modify them without touching the shared cache.
+    `track_activity=True` marks a user opening the zone, which keeps it in the background refresh.
+    """
+    cache_key = (provider, token, zone_identifier)
+    if track_activity and use_cache:
+        _DNS_RECORDS_LAST_READ[cache_key] = time.monotonic()
+    cached = _DNS_RECORDS_CACHE.get(cache_key)
+    if use_cache and cached and time.monotonic() - cached[0] < DNS_RECORDS_CACHE_TTL:
+        return [dict(r) for r in cached[1]]
+
+    records = await _fetch_dns_records_into_cache(cache_key)
+    return [dict(r) for r in records]
+
+async def _fetch_dns_records_into_cache(cache_key: tuple):
+    """Fetches a zone listing and caches it, unless the zone was changed while the fetch was in flight."""
+    provider, token, zone_identifier = cache_key
+    started = time.monotonic()
     if provider == "arvan":
-        return await arvan_get_dns_records(token, zone_identifier)
-    return await get_dns_records(token, zone_identifier)
+        records = await arvan_get_dns_records(token, zone_identifier)
+    else:
+        records = await get_dns_records(token, zone_identifier)
+    if records and DNS_RECORDS_CACHE_TTL and _DNS_RECORDS_INVALIDATED_AT.get(zone_identifier, 0) < started:
+        _DNS_RECORDS_CACHE[cache_key] = (time.monotonic(), records)
+    return records
+
+async def refresh_dns_records_cache_job(context: ContextTypes.DEFAULT_TYPE):
+    """Re-fetches the listings of zones users opened in the last DNS_RECORDS_REFRESH_WINDOW seconds, so reopening them is served from memory."""
+    now = time.monotonic()
+    active = {k: t for k, t in _DNS_RECORDS_LAST_READ.items() if now - t < DNS_RECORDS_REFRESH_WINDOW}
+    _DNS_RECORDS_LAST_READ.clear()
+    _DNS_RECORDS_LAST_READ.update(active)
+    if active:
+        await run_bulk_dns_calls((_fetch_dns_records_into_cache(k) for k in active), semaphore=_DNS_REFRESH_SEMAPHORE)
 
 def _arvan_short_record_name(name: str, domain: str) -> str:
     if not name:
@@ -1036,6 +1261,7 @@ def build_arvan_update_payload(record: dict, domain: str, new_content: str, new_
             payload[key] = raw[key]
     return payload
 
+@invalidates_zone_records
 async def arvan_create_record(token: str, domain: str, rtype: str, name: str, content: str, proxied: bool):
     url = f"https://napi.arvancloud.ir/cdn/4.0/domains/{domain}/dns-records"
     payload = build_arvan_record_payload(rtype, name, content, proxied, domain, ttl=None)
@@ -1048,10 +1274,12 @@ async def arvan_create_record(token: str, domain: str, rtype: str, name: str, co
             return res
     return last_res or {"success": False, "errors": [{"message": "Arvan record creation failed."}]}
 
+@invalidates_zone_records
 async def arvan_delete_record(token: str, domain: str, rid: str):
     url = f"https://napi.arvancloud.ir/cdn/4.0/domains/{domain}/dns-records/{rid}"
     return await arvan_api_request(token, "delete", url)
 
+@invalidates_zone_records
 async def arvan_update_record(token: str, domain: str, record: dict, content: str):
     record_id = record.get("id")
     if not record_id:
@@ -1125,6 +1353,13 @@ async def delete_provider_record(provider: str, token: str, zone_identifier: str
         return await arvan_delete_record(token, zone_identifier, rid)
     return await delete_record(token, zone_identifier, rid)
 
+async def run_bulk_dns_calls(coros, semaphore: asyncio.Semaphore = _DNS_BULK_SEMAPHORE) -> list:
+    """Runs DNS API calls concurrently, capped by `semaphore` (the DNS_BULK_CONCURRENCY bulk limiter by default)."""
+    async def _bounded(coro):
+        async with semaphore:
+            return await coro
+    return await asyncio.gather(*[_bounded(c) for c in coros])
+
 async def switch_dns_ip(context: ContextTypes.DEFAULT_TYPE, policy: dict, to_ip: str) -> int:
     policy_name = policy.get('policy_name', 'Unnamed Policy')
     provider = get_policy_provider(policy)
@@ -1143,27 +1378,29 @@ async def switch_dns_ip(context: ContextTypes.DEFAULT_TYPE, policy: dict, to_ip:
 
     zone_identifier = zone_name
     if provider == 'cloudflare':
-        zones = await get_all_zones(token)
-        zone_identifier = next((z['id'] for z in zones if z['name'] == zone_name), None)
+        zone_identifier = await get_zone_id(token, zone_name)
         if not zone_identifier:
             logger.error(f"DNS SWITCH FAILED for '{policy_name}': Could not find zone_id for '{zone_name}'.")
             return 0
 
-    all_records = await get_provider_dns_records(provider, token, zone_identifier)
+    all_records = await get_provider_dns_records(provider, token, zone_identifier, use_cache=False)
     success_count = 0
-    records_to_update = policy.get('record_names', [])
+    records_to_update = set(policy.get('record_names', []))
+    pending = [
+        r for r in all_records
+        if get_short_name(r['name'], zone_name) in records_to_update and r.get('content') != to_ip
+    ]
+    for record in pending:
+        logger.info(f"DNS SWITCH: Updating {get_provider_label(provider)} record '{record['name']}' from '{record.get('content')}' to '{to_ip}'...")
 
-    for record in all_records:
-        short_name = get_short_name(record['name'], zone_name)
-        if short_name in records_to_update and record.get('content') != to_ip:
-            logger.info(f"DNS SWITCH: Updating {get_provider_label(provider)} record '{record['name']}' from '{record.get('content')}' to '{to_ip}'...")
-            res = await update_provider_record(provider, token, zone_identifier, record, to_ip)
-            if res.get("success") is not False:
-                logger.info(f"SUCCESS: Record '{record['name']}' updated.")
-                success_count += 1
-            else:
-                error_msg = res.get('errors', [{}])[0].get('message', 'Unknown error')
-                logger.error(f"DNS SWITCH FAILED for '{record['name']}'. Reason: {error_msg}")
+    results = await run_bulk_dns_calls(update_provider_record(provider, token, zone_identifier, r, to_ip) for r in pending)
+    for record, res in zip(pending, results):
+        if res.get("success") is not False:
+            logger.info(f"SUCCESS: Record '{record['name']}' updated.")
+            success_count += 1
+        else:
+            error_msg = get_api_error_message(res)
+            logger.error(f"DNS SWITCH FAILED for '{record['name']}'. Reason: {error_msg}")
 
     if success_count > 0 and provider == 'cloudflare':
         await clear_zone_cache_for_all_users(context.application.persistence, zone_identifier)
@@ -1182,15 +1419,11 @@ async def get_policy_current_dns_ip(policy: dict) -> str | None:
 
     zone_identifier = zone_name
     if provider == 'cloudflare':
-        zones = await get_all_zones(token)
-        zone_identifier = next((z['id'] for z in zones if z['name'] == zone_name), None)
+        zone_identifier = await get_zone_id(token, zone_name)
         if not zone_identifier:
             return None
 
-    all_dns_records = await get_provider_dns_records(provider, token, zone_identifier)
-    if all_dns_records is None:
-        return None
-
+    all_dns_records = await get_provider_dns_records(provider, token, zone_identifier, use_cache=False)
     actual_record = next((r for r in all_dns_records if get_short_name(r['name'], zone_name) in record_names), None)
     return actual_record.get('content') if actual_record else None
 
@@ -1383,7 +1616,8 @@ async def perform_health_checks(context: ContextTypes.DEFAULT_TYPE, unique_check
 async def health_check_job(context: ContextTypes.DEFAULT_TYPE):
     async with health_check_lock:
         job_started_at = time.monotonic()
-        load_translations()
+        if load_translations():
+            clear_label_caches()
         monitoring_log = load_monitoring_log()
 
         try:
@@ -2026,12 +2260,75 @@ async def send_daily_report_job(context: ContextTypes.DEFAULT_TYPE):
         except Exception as e:
             logger.error(f"Failed to send daily report to {chat_id}: {e}")
 
-def clear_state(context: ContextTypes.DEFAULT_TYPE, preserve=None):
-    if preserve is None: preserve = []
-    if 'language' not in preserve: preserve.append('language')
-    preserved_data = {key: context.user_data[key] for key in preserve if key in context.user_data}
-    context.user_data.clear()
-    context.user_data.update(preserved_data)
+ACCOUNT_STATE_KEYS = frozenset({'language', 'selected_provider', 'selected_account_nickname'})
+ZONE_STATE_KEYS = ACCOUNT_STATE_KEYS | {'all_zones', 'selected_zone_id', 'selected_zone_name'}
+RECORD_CACHE_KEYS = ('records_list_cache', 'all_records', 'records', 'all_records_lower')
+RECORDS_STATE_KEYS = ZONE_STATE_KEYS | set(RECORD_CACHE_KEYS)
+SEARCH_STATE_KEYS = frozenset({'search_query', 'search_ip_query', 'pending_global_search'})
+RECORDS_VIEW_STATE_KEYS = frozenset({'records_in_view', 'records_in_view_key', 'search_query', 'search_ip_query'})
+
+def clear_state(context: ContextTypes.DEFAULT_TYPE, preserve=frozenset()):
+    user_data = context.user_data
+    for key in user_data.keys() - preserve - {'language'}:
+        del user_data[key]
+
+def invalidate_records_list(context: ContextTypes.DEFAULT_TYPE):
+    """Forgets the user's cached zone listing after a record change, so the next list render re-fetches it."""
+    for key in RECORD_CACHE_KEYS:
+        context.user_data.pop(key, None)
+
+def _patch_records_list(context: ContextTypes.DEFAULT_TYPE, rid: str, record: dict = None):
+    """Replaces, appends or (with record=None) removes one record in the cached listing, keeping its fetch timestamp."""
+    cache = context.user_data.get('records_list_cache')
+    if not cache:
+        return
+    records = cache['data']
+    if context.user_data.get('all_records') is not records or 'records' not in context.user_data or 'all_records_lower' not in context.user_data:
+        _set_all_records(context, records)
+    # Patch the list and both indexes in place rather than rebuilding them for a one-record change.
+    by_id, names_lower = context.user_data['records'], context.user_data['all_records_lower']
+    old = by_id.pop(rid, None)
+    position = next((i for i, r in enumerate(records) if r is old), len(records)) if old is not None else len(records)
+    if position < len(records):
+        del records[position], names_lower[position]
+    if record is not None:
+        new = slim_dns_records([record])[0]
+        records.insert(position, new)
+        names_lower.insert(position, str(new.get('name', '')).casefold())
+        by_id[new['id']] = new
+    context.user_data.pop('records_in_view', None)
+
+def cache_record_saved(context: ContextTypes.DEFAULT_TYPE, provider: str, zone_identifier: str, rid: str, res: dict):
+    """Writes a created or updated record from the API response into the cached listing, instead of re-fetching the zone."""
+    data = res.get("data") if provider == "arvan" else res.get("result")
+    if not isinstance(data, dict) or not data.get("id"):
+        invalidate_records_list(context); return
+    record = normalize_arvan_record(data, zone_identifier) if provider == "arvan" else data
+    _patch_records_list(context, rid or record['id'], record)
+
+def cache_record_deleted(context: ContextTypes.DEFAULT_TYPE, rid: str):
+    """Drops a deleted record from the cached listing, instead of re-fetching the zone."""
+    _patch_records_list(context, rid)
+
+def cache_records_deleted(context: ContextTypes.DEFAULT_TYPE, rids):
+    """Drops several deleted records from the cached listing in one pass."""
+    cache = context.user_data.get('records_list_cache')
+    if not cache:
+        return
+    rids = set(rids)
+    cache['data'] = [r for r in cache['data'] if r['id'] not in rids]
+    _set_all_records(context, cache['data'])
+    context.user_data.pop('records_in_view', None)
+
+async def drop_persisted_record_caches(application: Application):
+    """Drops record listings restored from the pickle file; they are stale after a restart and would otherwise sit in memory until each user lists again."""
+    dropped = 0
+    for data in application.user_data.values():
+        for key in RECORD_CACHE_KEYS:
+            if data.pop(key, None) is not None:
+                dropped += 1
+    if dropped:
+        logger.info(f"Dropped {dropped} persisted record cache entries on startup.")
 
 async def display_records_for_selection(update: Update, context: ContextTypes.DEFAULT_TYPE, page: int = 0):
     """Displays a paginated list of records for policy selection."""
@@ -2078,8 +2375,7 @@ async def display_records_for_selection(update: Update, context: ContextTypes.DE
 
         zone_identifier = zone_name
         if provider == 'cloudflare':
-            zones = await get_all_zones(token)
-            zone_identifier = next((z['id'] for z in zones if z['name'] == zone_name), None)
+            zone_identifier = await get_zone_id(token, zone_name)
             if not zone_identifier:
                 if query: await query.edit_message_text(get_text('messages.error_no_zone_id', lang)); return
 
@@ -2325,8 +2621,9 @@ async def display_zones_list(update: Update, context: ContextTypes.DEFAULT_TYPE,
         context.user_data[cache_key] = zones
 
     all_zones = context.user_data[cache_key]
-    context.user_data['all_zones_cache'] = all_zones
-    context.user_data['all_zones'] = {z['id']: z for z in all_zones}
+    if context.user_data.get('all_zones_cache') is not all_zones or 'all_zones' not in context.user_data:
+        context.user_data['all_zones_cache'] = all_zones
+        context.user_data['all_zones'] = {z['id']: z for z in all_zones}
 
     config = load_config()
     aliases = config.get('zone_aliases', {})
@@ -2337,16 +2634,14 @@ async def display_zones_list(update: Update, context: ContextTypes.DEFAULT_TYPE,
     end_index = start_index + ZONES_PER_PAGE
     zones_on_page = sorted_zones[start_index:end_index]
 
-    buttons = []
-    for zone in zones_on_page:
-        zone_id = zone['id']
-        zone_name = zone['name']
-        alias = aliases.get(zone_id)
-        button_text = alias if alias else zone_name
-        buttons.append([
-            InlineKeyboardButton(button_text, callback_data=f"select_zone|{zone_id}"),
-            InlineKeyboardButton(get_text('buttons.set_zone_alias', lang), callback_data=f"set_alias_start|{zone_id}")
-        ])
+    set_alias_label = get_text('buttons.set_zone_alias', lang)
+    buttons = [
+        [
+            InlineKeyboardButton(aliases.get(zone['id']) or zone['name'], callback_data=f"select_zone|{zone['id']}"),
+            InlineKeyboardButton(set_alias_label, callback_data=f"set_alias_start|{zone['id']}")
+        ]
+        for zone in zones_on_page
+    ]
 
     pagination_buttons = []
     if page > 0:
@@ -2362,6 +2657,26 @@ async def display_zones_list(update: Update, context: ContextTypes.DEFAULT_TYPE,
     text = get_text('messages.choose_zone', lang)
     await send_or_edit(update, context, text, reply_markup=InlineKeyboardMarkup(buttons))
 
+def clear_label_caches():
+    """Drops the per-language keyboards built from translated labels, after the translation files change."""
+    records_list_action_rows.cache_clear()
+    add_type_keyboard.cache_clear()
+
+@lru_cache(maxsize=None)
+def records_list_action_rows(lang: str) -> tuple:
+    """The static add/search/bulk and refresh/settings rows under the records list, built once per language."""
+    return (
+        (
+            InlineKeyboardButton(get_text('buttons.add_record', lang), callback_data="add"),
+            InlineKeyboardButton(get_text('buttons.search', lang), callback_data="search_menu"),
+            InlineKeyboardButton(get_text('buttons.bulk_actions', lang), callback_data="bulk_start")
+        ),
+        (
+            InlineKeyboardButton(get_text('buttons.refresh', lang), callback_data="refresh_list"),
+            InlineKeyboardButton(get_text('buttons.settings', lang), callback_data="go_to_settings")
+        ),
+    )
+
 async def display_records_list(update: Update, context: ContextTypes.DEFAULT_TYPE, page=0):
     lang = get_user_lang(context)
     token = get_current_token(context)
@@ -2377,9 +2692,11 @@ async def display_records_list(update: Update, context: ContextTypes.DEFAULT_TYP
 
     if not records or not cache_time or (datetime.now() - cache_time) > timedelta(minutes=5):
         await send_or_edit(update, context, get_text('messages.fetching_records', lang))
-        records = await get_provider_dns_records(provider, token, zone_id)
+        records = slim_dns_records(await get_provider_dns_records(provider, token, zone_id, track_activity=True))
         context.user_data['records_list_cache'] = {'data': records, 'timestamp': datetime.now()}
-    context.user_data['all_records'] = records
+    records_changed = context.user_data.get('all_records') is not records
+    if records_changed or "records" not in context.user_data or 'all_records_lower' not in context.user_data:
+        _set_all_records(context, records)
 
     config = load_config()
     record_aliases = config.get('record_aliases', {}).get(zone_id, {})
@@ -2397,16 +2714,17 @@ async def display_records_list(update: Update, context: ContextTypes.DEFAULT_TYP
                 monitored_records_lb.add(record_name)
 
     search_query, search_ip_query = context.user_data.get('search_query'), context.user_data.get('search_ip_query')
+    search_key = ('name', search_query.casefold().strip()) if search_query else ('ip', search_ip_query.strip()) if search_ip_query else None
 
-    if search_query:
-        q = search_query.lower().strip()
-        records_in_view = [r for r in context.user_data.get('all_records', []) if q in str(r.get('name', '')).lower()]
-        context.user_data['records_in_view'] = records_in_view
-        context.user_data.pop('pending_global_search', None)
-    elif search_ip_query:
-        ip_q = search_ip_query.strip()
-        records_in_view = [r for r in context.user_data.get('all_records', []) if str(r.get('content', '')).strip() == ip_q]
+    if search_key and (records_changed or context.user_data.get('records_in_view_key') != search_key or 'records_in_view' not in context.user_data):
+        if search_query:
+            q = search_key[1]
+            records_in_view = [r for r, name in zip(records, context.user_data['all_records_lower']) if q in name]
+        else:
+            ip_q = search_key[1]
+            records_in_view = [r for r in records if str(r.get('content', '')).strip() == ip_q]
         context.user_data['records_in_view'] = records_in_view
+        context.user_data['records_in_view_key'] = search_key
         context.user_data.pop('pending_global_search', None)
     else:
         records_in_view = context.user_data.get('records_in_view', context.user_data.get('all_records', []))
@@ -2426,35 +2744,29 @@ async def display_records_list(update: Update, context: ContextTypes.DEFAULT_TYP
         await send_or_edit(update, context, f"{header_text}\n\n{msg_text}", InlineKeyboardMarkup(buttons))
         return
 
-    context.user_data["records"] = {r['id']: r for r in context.user_data.get('all_records', [])}
     records_on_page = records_in_view[page * RECORDS_PER_PAGE:(page + 1) * RECORDS_PER_PAGE]
-    is_bulk_mode, selected_records = context.user_data.get('is_bulk_mode', False), context.user_data.get('selected_records', [])
+    is_bulk_mode, selected_records = context.user_data.get('is_bulk_mode', False), context.user_data.get('selected_records', set())
 
     if is_bulk_mode:
         all_ids_in_view = {r['id'] for r in records_in_view}
-        select_all_text = get_text('buttons.deselect_all' if all_ids_in_view and all_ids_in_view.issubset(set(selected_records)) else 'buttons.select_all', lang)
+        select_all_text = get_text('buttons.deselect_all' if all_ids_in_view and all_ids_in_view.issubset(selected_records) else 'buttons.select_all', lang)
         buttons.append([InlineKeyboardButton(select_all_text, callback_data=f"bulk_select_all|{page}")])
 
     for r in records_on_page:
         short_name = get_short_name(r['name'], zone_name)
+        icons_str = ("🛡️" if short_name in monitored_records_failover else "") + ("🚦" if short_name in monitored_records_lb else "")
 
-        status_icons = []
-        if short_name in monitored_records_failover:
-            status_icons.append("🛡️")
-        if short_name in monitored_records_lb:
-            status_icons.append("🚦")
-
-        icons_str = "".join(status_icons)
-
-        proxy_icon = "☁️" if r.get('proxied') else "⬜️"
-        check_icon = "✅" if is_bulk_mode and r['id'] in selected_records else "▫️"
+        if is_bulk_mode:
+            state_icon = CHECK_ON_ICON if r['id'] in selected_records else CHECK_OFF_ICON
+            callback_data = f"bulk_select|{r['id']}|{page}"
+        else:
+            state_icon = PROXY_ON_ICON if r.get('proxied') else PROXY_OFF_ICON
+            callback_data = f"select|{r['id']}"
 
-        alias_key = f"{r['type']}:{r['name']}"
-        alias = record_aliases.get(alias_key)
+        alias = record_aliases.get(f"{r['type']}:{r['name']}")
         alias_display = f" ({escape_html(alias)})" if alias else ""
 
-        button_text = f"{icons_str} {check_icon if is_bulk_mode else proxy_icon} {r['type']} {short_name}{alias_display}"
-        callback_data = f"bulk_select|{r['id']}|{page}" if is_bulk_mode else f"select|{r['id']}"
+        button_text = f"{icons_str} {state_icon} {r['type']} {short_name}{alias_display}"
         buttons.append([InlineKeyboardButton(button_text, callback_data=callback_data)])
 
     pagination_buttons = []
@@ -2470,15 +2782,7 @@ async def display_records_list(update: Update, context: ContextTypes.DEFAULT_TYP
         ])
         buttons.append([InlineKeyboardButton(get_text('buttons.cancel', lang), callback_data="bulk_cancel")])
     else:
-        buttons.append([
-            InlineKeyboardButton(get_text('buttons.add_record', lang), callback_data="add"),
-            InlineKeyboardButton(get_text('buttons.search', lang), callback_data="search_menu"),
-            InlineKeyboardButton(get_text('buttons.bulk_actions', lang), callback_data="bulk_start")
-        ])
-        buttons.append([
-            InlineKeyboardButton(get_text('buttons.refresh', lang), callback_data="refresh_list"),
-            InlineKeyboardButton(get_text('buttons.settings', lang), callback_data="go_to_settings")
-        ])
+        buttons.extend(records_list_action_rows(lang))
 
     buttons.append([InlineKeyboardButton(get_text('buttons.back_to_zones', lang), callback_data="back_to_zones")])
     await send_or_edit(update, context, f"{header_text}\n\n{message_text}", InlineKeyboardMarkup(buttons))
@@ -2490,7 +2794,7 @@ async def lb_force_rotate_callback(update: Update, context: ContextTypes.DEFAULT
     lang = get_user_lang(context)
 
     try:
-        policy_index = int(query.data.split('|')[1])
+        policy_index = int(query.data.partition('|')[2])
         config = load_config()
         policy = config['load_balancer_policies'][policy_index]
         policy_name = policy.get('policy_name')
@@ -2693,7 +2997,7 @@ async def zones_page_callback(update: Update, context: ContextTypes.DEFAULT_TYPE
     """Handles pagination for the zones list."""
     query = update.callback_query
     await query.answer()
-    page = int(query.data.split('|')[1])
+    page = int(query.data.partition('|')[2])
     await display_zones_list(update, context, page=page)
 
 async def get_chat_id_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -3006,7 +3310,7 @@ async def monitor_change_group_start_callback(update: Update, context: ContextTy
     lang = get_user_lang(context)
 
     try:
-        monitor_index = int(query.data.split('|')[1])
+        monitor_index = int(query.data.partition('|')[2])
         context.user_data['edit_monitor_index'] = monitor_index
     except (IndexError, ValueError):
         await query.edit_message_text(get_text('messages.session_expired_error', lang))
@@ -3217,7 +3521,7 @@ async def monitor_edit_menu_callback(update: Update, context: ContextTypes.DEFAU
 
     try:
         if query and "monitor_edit|" in query.data:
-            monitor_index = int(query.data.split('|')[1])
+            monitor_index = int(query.data.partition('|')[2])
         else:
             monitor_index = context.user_data.get('edit_monitor_index')
 
@@ -3286,7 +3590,7 @@ async def monitor_delete_confirm_callback(update: Update, context: ContextTypes.
     lang = get_user_lang(context)
 
     try:
-        monitor_index = int(query.data.split('|')[1])
+        monitor_index = int(query.data.partition('|')[2])
         config = load_config()
         monitor_name = config['standalone_monitors'][monitor_index]['monitor_name']
     except (IndexError, ValueError, KeyError):
@@ -3307,7 +3611,7 @@ async def monitor_delete_execute_callback(update: Update, context: ContextTypes.
     lang = get_user_lang(context)
 
     try:
-        monitor_index = int(query.data.split('|')[1])
+        monitor_index = int(query.data.partition('|')[2])
         config = load_config()
         monitor = config['standalone_monitors'].pop(monitor_index)
         save_config(config)
@@ -3396,7 +3700,7 @@ async def failover_start_backup_monitoring_callback(update: Update, context: Con
     lang = get_user_lang(context)
 
     try:
-        policy_index = int(query.data.split('|')[1])
+        policy_index = int(query.data.partition('|')[2])
     except (IndexError, ValueError):
         await query.edit_message_text(get_text('messages.session_expired_error', lang))
         return
@@ -3424,7 +3728,7 @@ async def set_record_alias_start_callback(update: Update, context: ContextTypes.
     lang = get_user_lang(context)
 
     try:
-        rid = query.data.split('|')[1]
+        rid = query.data.partition('|')[2]
         record = context.user_data['records'][rid]
     except (IndexError, KeyError):
         await query.edit_message_text(get_text('messages.internal_error', lang))
@@ -3449,7 +3753,7 @@ async def set_alias_start_callback(update: Update, context: ContextTypes.DEFAULT
     lang = get_user_lang(context)
 
     try:
-        zone_id = query.data.split('|')[1]
+        zone_id = query.data.partition('|')[2]
         zone_name = context.user_data['all_zones'][zone_id]['name']
     except (IndexError, KeyError):
         await query.edit_message_text(get_text('messages.internal_error', lang))
@@ -3508,7 +3812,7 @@ async def set_log_retention_callback(update: Update, context: ContextTypes.DEFAU
     query = update.callback_query
     lang = get_user_lang(context)
 
-    days = int(query.data.split('|')[1])
+    days = int(query.data.partition('|')[2])
 
     config = load_config()
     config['log_retention_days'] = days
@@ -3597,7 +3901,7 @@ async def admin_remove_confirm_callback(update: Update, context: ContextTypes.DE
         await query.answer(get_text('messages.not_a_super_admin', lang), show_alert=True)
         return
 
-    admin_id_to_remove = int(query.data.split('|')[1])
+    admin_id_to_remove = int(query.data.partition('|')[2])
     config = load_config()
 
     if admin_id_to_remove in config.get("admins", []):
@@ -3646,7 +3950,7 @@ async def remove_recipient_confirm_callback(update: Update, context: ContextType
     await query.answer()
     lang = get_user_lang(context)
 
-    recipient_id_to_remove = int(query.data.split('|')[1])
+    recipient_id_to_remove = int(query.data.partition('|')[2])
     config = load_config()
 
     if recipient_id_to_remove in config.get("notifications", {}).get("chat_ids", []):
@@ -3729,7 +4033,7 @@ async def generate_report_callback(update: Update, context: ContextTypes.DEFAULT
     await query.answer()
 
     try:
-        days = int(query.data.split('|')[1])
+        days = int(query.data.partition('|')[2])
 
         await query.edit_message_text(get_text('messages.generating_report', lang), parse_mode="HTML")
 
@@ -3869,7 +4173,7 @@ async def lb_policy_change_algo_callback(update: Update, context: ContextTypes.D
     lang = get_user_lang(context)
 
     try:
-        policy_index = int(query.data.split('|')[1])
+        policy_index = int(query.data.partition('|')[2])
         config = load_config()
         policy = config['load_balancer_policies'][policy_index]
 
@@ -3978,7 +4282,7 @@ async def policy_edit_nodes_start_callback(update: Update, context: ContextTypes
     if not all([policy_type, policy_index is not None]):
         await query.edit_message_text("Error: Session expired. Please start over."); return
 
-    monitoring_type = query.data.split('|')[1]
+    monitoring_type = query.data.partition('|')[2]
     context.user_data['monitoring_type'] = monitoring_type
 
     config = load_config()
@@ -3998,7 +4302,7 @@ async def policy_edit_nodes_start_callback(update: Update, context: ContextTypes
 async def policy_country_page_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handles pagination for the country list."""
     query = update.callback_query
-    page = int(query.data.split('|')[1])
+    page = int(query.data.partition('|')[2])
     await display_countries_for_selection(update, context, page=page)
 
 async def policy_select_country_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -4098,7 +4402,7 @@ async def policy_confirm_nodes_callback(update: Update, context: ContextTypes.DE
 async def policy_records_page_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     await query.answer()
-    page = int(query.data.split('|')[1])
+    page = int(query.data.partition('|')[2])
     await display_records_for_selection(update, context, page=page)
 
 async def policy_select_record_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -4261,21 +4565,21 @@ async def policy_confirm_records_callback(update: Update, context: ContextTypes.
                 if best_ip_to_use and token and zone_name:
                     zone_identifier = zone_name
                     if provider == 'cloudflare':
-                        all_zones_fetched = await get_all_zones(token)
-                        zone_identifier = next((z['id'] for z in all_zones_fetched if z['name'] == zone_name), None)
+                        zone_identifier = await get_zone_id(token, zone_name)
 
                     if zone_identifier:
                         update_count = 0
+                        records_by_name = index_records_by_name(cached_records)
                         for short_name in selected_short_names:
                             full_name = zone_name if short_name == '@' else f"{short_name}.{zone_name}"
-                            target_record = next((r for r in cached_records if r['name'] == full_name), None)
+                            target_record = records_by_name.get(full_name)
 
                             if target_record and target_record.get('content') != best_ip_to_use:
                                  res = await update_provider_record(provider, token, zone_identifier, target_record, best_ip_to_use)
                                  if res.get('success') is not False:
                                      update_count += 1
                                  else:
-                                     logger.error(f"Initial DNS sync failed for {full_name}: {res.get('errors', [{}])[0].get('message', 'Unknown error')}")
+                                     logger.error(f"Initial DNS sync failed for {full_name}: {get_api_error_message(res)}")
 
                         if update_count > 0:
                             await send_or_edit(update, context, get_text('messages.ip_sync_success', lang, count=update_count, ip=best_ip_to_use))
@@ -4308,13 +4612,13 @@ async def policy_confirm_records_callback(update: Update, context: ContextTypes.
 
                      zone_identifier = zone_name
                      if provider == 'cloudflare':
-                         all_zones_fetched = await get_all_zones(token)
-                         zone_identifier = next((z['id'] for z in all_zones_fetched if z['name'] == zone_name), None)
+                         zone_identifier = await get_zone_id(token, zone_name)
 
                      if zone_identifier:
+                         records_by_name = index_records_by_name(cached_records)
                          for short_name in selected_short_names:
                             full_name = zone_name if short_name == '@' else f"{short_name}.{zone_name}"
-                            target_record = next((r for r in cached_records if r['name'] == full_name), None)
+                            target_record = records_by_name.get(full_name)
                             if target_record and target_record.get('content') != target_ip_to_sync:
                                 await update_provider_record(provider, token, zone_identifier, target_record, target_ip_to_sync)
 
@@ -4333,7 +4637,7 @@ async def policy_set_failback_callback(update: Update, context: ContextTypes.DEF
     await query.answer()
     lang = get_user_lang(context)
 
-    choice = query.data.split('|')[1]
+    choice = query.data.partition('|')[2]
     auto_failback_enabled = (choice == 'true')
 
     context.user_data['new_policy_data']['auto_failback'] = auto_failback_enabled
@@ -4351,7 +4655,7 @@ async def failover_policy_toggle_failback_callback(update: Update, context: Cont
     lang = get_user_lang(context)
 
     try:
-        policy_index = int(query.data.split('|')[1])
+        policy_index = int(query.data.partition('|')[2])
         config = load_config()
         if config is None: raise IndexError
 
@@ -4380,7 +4684,7 @@ async def failover_policy_toggle_callback(update: Update, context: ContextTypes.
     lang = get_user_lang(context)
 
     try:
-        policy_index = int(query.data.split('|')[1])
+        policy_index = int(query.data.partition('|')[2])
         config = load_config()
         if config is None: raise IndexError
 
@@ -4701,20 +5005,6 @@ async def _handle_state_notification_recipient(update: Update, context: ContextT
     dummy_update = context.application.create_dummy_update(update, update.message.message_id, callback_data=f"notification_edit_recipients|{recipient_key}")
     await notification_edit_recipients_callback(dummy_update, context)
 
-async def _create_dummy_update_from_text(update: Update, callback_data: str):
-    """Creates a dummy Update object with a CallbackQuery from a text message."""
-    async def dummy_answer(*args, **kwargs): return True
-    message_obj = update.message if hasattr(update, 'message') and update.message else update.callback_query.message
-
-    dummy_query = type('obj', (object,), {
-        'data': callback_data, 'answer': dummy_answer,
-        'message': message_obj, 'is_dummy': True
-    })
-    return type('obj', (object,), {
-        'callback_query': dummy_query, 'effective_user': update.effective_user,
-        'effective_chat': update.effective_chat
-    })
-
 async def _handle_state_lb_ip_management(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handles all text inputs for managing Load Balancer IP addresses/hostnames and weights."""
     lang = get_user_lang(context)
@@ -4953,7 +5243,7 @@ async def _handle_state_record_management(update: Update, context: ContextTypes.
             else:
                 context.user_data["new_name"] = new_name
                 context.user_data["add_step"] = "content"
-                prompt_text_key = 'prompts.enter_ip' if context.user_data.get("new_type") in ['A', 'AAAA'] else 'prompts.enter_content'
+                prompt_text_key = 'prompts.enter_ip' if context.user_data.get("new_type") in IP_RECORD_TYPES else 'prompts.enter_content'
                 await send_or_edit(update, context, get_text(prompt_text_key, lang, name=escape_html(text.strip())), parse_mode="HTML")
         elif step == "content":
             context.user_data["new_content"] = text
@@ -5008,27 +5298,19 @@ async def _handle_state_record_management(update: Update, context: ContextTypes.
                 parse_mode="HTML"
             )
 
-            context.user_data.pop('all_records', None)
-            context.user_data.pop('records_list_cache', None)
+            cache_record_saved(context, provider, zone_id, rid, res)
 
             await asyncio.sleep(2)
             try: await temp_msg.delete()
             except Exception: pass
 
-            context.user_data['selected_record_id_for_view'] = rid
-
-            all_records = await get_provider_dns_records(get_current_provider(context), token, zone_id)
-            if all_records is not None:
-                context.user_data['all_records'] = all_records
-                context.user_data["records"] = {r['id']: r for r in all_records}
-
-            await select_callback(update, context, force_new_message=True)
+            await show_record_view(update, context, rid, force_new_message=True)
         else:
-            error_msg = res.get('errors', [{}])[0].get('message', 'Unknown error')
+            error_msg = get_api_error_message(res)
             await send_or_edit(update, context, get_text('messages.error_updating_record', lang, error=error_msg))
 
     elif context.user_data.get('is_bulk_ip_change'):
-        selected_ids = context.user_data.get('selected_records', [])
+        selected_ids = list(context.user_data.get('selected_records', ()))
         context.user_data.pop('is_bulk_ip_change')
         context.user_data['bulk_ip_confirm_details'] = {'new_ip': text, 'record_ids': selected_ids}
         kb = [[InlineKeyboardButton(get_text('buttons.confirm_action', lang), callback_data="bulk_change_ip_execute")],
@@ -5408,10 +5690,6 @@ async def _handle_state_searching(update: Update, context: ContextTypes.DEFAULT_
             await display_account_list(update, context, force_new_message=True)
             return
 
-        context.user_data['records_in_view'] = [
-            r for r in context.user_data.get('all_records', [])
-            if text.lower() in str(r.get('name', '')).lower()
-        ]
         await display_records_list(update, context)
 
     elif context.user_data.get('is_searching_ip'):
@@ -5424,10 +5702,6 @@ async def _handle_state_searching(update: Update, context: ContextTypes.DEFAULT_
             await display_account_list(update, context, force_new_message=True)
             return
 
-        context.user_data['records_in_view'] = [
-            r for r in context.user_data.get('all_records', [])
-            if str(r.get('content', '')).strip() == text
-        ]
         await display_records_list(update, context)
 
 async def _handle_state_change_record_type(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -5456,7 +5730,8 @@ async def _handle_state_change_record_type(update: Update, context: ContextTypes
     updated_record["type"] = new_type
     updated_record["content"] = new_content
     updated_record["proxied"] = proxied
-    res = await update_provider_record(get_current_provider(context), token, zone_id, updated_record, new_content)
+    provider = get_current_provider(context)
+    res = await update_provider_record(provider, token, zone_id, updated_record, new_content)
 
     if res.get("success"):
         temp_msg = await context.bot.send_message(
@@ -5465,23 +5740,15 @@ async def _handle_state_change_record_type(update: Update, context: ContextTypes
             parse_mode="HTML"
         )
 
-        context.user_data.pop('all_records', None)
-        context.user_data.pop('records_list_cache', None)
+        cache_record_saved(context, provider, zone_id, rid, res)
 
         await asyncio.sleep(2)
         try: await temp_msg.delete()
         except Exception: pass
 
-        context.user_data['selected_record_id_for_view'] = rid
-
-        all_records = await get_provider_dns_records(get_current_provider(context), token, zone_id)
-        if all_records is not None:
-            context.user_data['all_records'] = all_records
-            context.user_data["records"] = {r['id']: r for r in all_records}
-
-        await select_callback(update, context, force_new_message=True)
+        await show_record_view(update, context, rid, force_new_message=True)
     else:
-        error_msg = res.get('errors', [{}])[0].get('message', 'Unknown error')
+        error_msg = get_api_error_message(res)
         await send_or_edit(update, context, get_text('messages.error_updating_record', lang, error=error_msg))
 
 async def _handle_state_edit_record_value(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -5534,7 +5801,7 @@ async def handle_text(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await _handle_state_edit_policy_field(update, context)
         return
 
-    elif state in ['awaiting_lb_ip_address', 'awaiting_lb_ip_weight', 'awaiting_lb_new_ip']:
+    elif state in LB_IP_TEXT_STATES:
         await _handle_state_lb_ip_management(update, context)
         return
 
@@ -5554,15 +5821,11 @@ async def handle_text(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await _handle_state_group_add_name(update, context)
         return
 
-    elif state == 'awaiting_clone_name':
-        await _handle_state_awaiting_clone_name(update, context)
+    elif state in TEXT_STATE_HANDLERS:
+        await TEXT_STATE_HANDLERS[state](update, context)
         return
 
-    elif state == 'awaiting_notification_recipient':
-        await _handle_state_notification_recipient(update, context)
-        return
-
-    elif state == 'awaiting_health_check_interval' or context.user_data.get('awaiting_health_check_interval'):
+    elif context.user_data.get('awaiting_health_check_interval'):
         await _handle_state_health_interval(update, context)
         return
 
@@ -5603,16 +5866,16 @@ async def zones_page_callback(update: Update, context: ContextTypes.DEFAULT_TYPE
     """Handles pagination for the zones list."""
     query = update.callback_query
     await query.answer()
-    page = int(query.data.split('|')[1])
+    page = int(query.data.partition('|')[2])
     await display_zones_list(update, context, page=page)
 
 async def select_account_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     provider, nickname = parse_provider_account_callback(query.data)
 
-    preserve_keys = ['language']
+    preserve_keys = frozenset()
     if context.user_data.get('search_query') or context.user_data.get('search_ip_query') or context.user_data.get('pending_global_search'):
-        preserve_keys.extend(['search_query', 'search_ip_query', 'pending_global_search'])
+        preserve_keys = SEARCH_STATE_KEYS
 
     clear_state(context, preserve=preserve_keys)
     context.user_data['selected_provider'] = provider
@@ -5620,12 +5883,12 @@ async def select_account_callback(update: Update, context: ContextTypes.DEFAULT_
     await display_zones_list(update, context, page=0)
 
 async def back_to_accounts_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    clear_state(context, preserve=[])
+    clear_state(context)
     await display_account_list(update, context)
 
 async def refresh_list_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    context.user_data.pop('records_list_cache', None)
-    context.user_data.pop('all_records', None)
+    invalidate_dns_records_cache(context.user_data.get('selected_zone_id'))
+    invalidate_records_list(context)
     context.user_data.pop('records_in_view', None)
     context.user_data.pop('search_query', None)
     context.user_data.pop('search_ip_query', None)
@@ -5633,15 +5896,15 @@ async def refresh_list_callback(update: Update, context: ContextTypes.DEFAULT_TY
 
 async def select_zone_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
-    zone_id = query.data.split('|')[1]
+    zone_id = query.data.partition('|')[2]
     all_zones = context.user_data.get('all_zones', {})
     zone = all_zones.get(zone_id)
     if not zone:
         await query.edit_message_text("Error: Zone not found."); return
 
-    preserve_keys = ['language', 'selected_provider', 'selected_account_nickname', 'all_zones']
+    preserve_keys = ACCOUNT_STATE_KEYS | {'all_zones'}
     if context.user_data.get('search_query') or context.user_data.get('search_ip_query') or context.user_data.get('pending_global_search'):
-        preserve_keys.extend(['search_query', 'search_ip_query', 'pending_global_search'])
+        preserve_keys |= SEARCH_STATE_KEYS
 
     clear_state(context, preserve=preserve_keys)
     context.user_data['selected_zone_id'] = zone_id
@@ -5649,27 +5912,22 @@ async def select_zone_callback(update: Update, context: ContextTypes.DEFAULT_TYP
     await display_records_list(update, context)
 
 async def back_to_zones_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    clear_state(context, preserve=['language', 'selected_provider', 'selected_account_nickname'])
+    clear_state(context, preserve=ACCOUNT_STATE_KEYS)
     await display_zones_list(update, context, page=0)
 
 async def back_to_records_list_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     current_page = context.user_data.get('current_page', 0)
-    preserve_keys = ['language', 'selected_provider', 'selected_account_nickname', 'all_zones', 'selected_zone_id', 'selected_zone_name', 'all_records', 'records']
-    clear_state(context, preserve=preserve_keys)
+    clear_state(context, preserve=RECORDS_STATE_KEYS)
     await display_records_list(update, context, page=current_page)
 
-async def list_page_callback(update: Update, context: ContextTypes.DEFAULT_TYPE): await display_records_list(update, context, page=int(update.callback_query.data.split('|')[1]))
+async def list_page_callback(update: Update, context: ContextTypes.DEFAULT_TYPE): await display_records_list(update, context, page=int(update.callback_query.data.partition('|')[2]))
 
-async def select_callback(update: Update, context: ContextTypes.DEFAULT_TYPE, force_new_message: bool = False):
-    lang = get_user_lang(context)
-    query = update.callback_query
-
-    rid = None
-    if query and not getattr(query, 'is_dummy', False):
-        rid = query.data.split('|')[1]
-    elif 'selected_record_id_for_view' in context.user_data:
-        rid = context.user_data.pop('selected_record_id_for_view')
+async def select_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    await show_record_view(update, context, update.callback_query.data.partition('|')[2])
 
+async def show_record_view(update: Update, context: ContextTypes.DEFAULT_TYPE, rid: str, force_new_message: bool = False):
+    """Renders one record's details and action menu; shared by the select button and the flows that return to a record after changing it."""
+    lang = get_user_lang(context)
     if not rid:
         await send_or_edit(update, context, get_text('messages.session_expired_error', lang), force_new_message=force_new_message)
         return
@@ -5678,10 +5936,10 @@ async def select_callback(update: Update, context: ContextTypes.DEFAULT_TYPE, fo
         token = get_current_token(context)
         zone_id = context.user_data.get('selected_zone_id')
         if token and zone_id:
-            all_records = await get_provider_dns_records(get_current_provider(context), token, zone_id)
-            if all_records is not None:
-                context.user_data['all_records'] = all_records
-                context.user_data["records"] = {r['id']: r for r in all_records}
+            all_records = slim_dns_records(await get_provider_dns_records(get_current_provider(context), token, zone_id, track_activity=True))
+            # A failed fetch comes back empty; caching it would hide every record until the listing expires.
+            if all_records:
+                _set_all_records(context, all_records, fetched=True)
 
     record = context.user_data.get("records", {}).get(rid)
     if not record:
@@ -5709,7 +5967,11 @@ async def select_callback(update: Update, context: ContextTypes.DEFAULT_TYPE, fo
                         content=escape_html(record['content']),
                         proxy_status=proxy_text)
 
-    kb = [
+    await send_or_edit(update, context, text, record_menu_keyboard(rid, lang), force_new_message=force_new_message)
+
+def record_menu_keyboard(rid: str, lang: str) -> InlineKeyboardMarkup:
+    """The per-record action menu shown by show_record_view."""
+    return InlineKeyboardMarkup([
         [InlineKeyboardButton(get_text('buttons.edit_value', lang), callback_data=f"edit|{rid}")],
         [InlineKeyboardButton(get_text('buttons.set_record_alias', lang), callback_data=f"set_record_alias_start|{rid}")],
         [InlineKeyboardButton(get_text('buttons.change_type', lang), callback_data=f"change_type|{rid}")],
@@ -5717,16 +5979,14 @@ async def select_callback(update: Update, context: ContextTypes.DEFAULT_TYPE, fo
         [InlineKeyboardButton(get_text('buttons.toggle_proxy', lang), callback_data=f"toggle_proxy|{rid}")],
         [InlineKeyboardButton(get_text('buttons.delete', lang), callback_data=f"delete|{rid}")],
         [InlineKeyboardButton(get_text('buttons.back_to_list', lang), callback_data="back_to_records_list")]
-    ]
-
-    await send_or_edit(update, context, text, InlineKeyboardMarkup(kb), force_new_message=force_new_message)
+    ])
 
 async def move_record_start_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Starts the record move/copy process."""
     query = update.callback_query
     await query.answer()
 
-    rid = query.data.split('|')[1]
+    rid = query.data.partition('|')[2]
     context.user_data['move_record_rid'] = rid
 
     provider = get_current_provider(context)
@@ -5748,7 +6008,7 @@ async def move_select_dest_account_callback(update: Update, context: ContextType
     query = update.callback_query
     await query.answer()
 
-    dest_account_nickname = query.data.split('|')[1]
+    dest_account_nickname = query.data.partition('|')[2]
     context.user_data['move_dest_account_nickname'] = dest_account_nickname
     await display_destination_zones(update, context, dest_account_nickname)
 
@@ -5790,7 +6050,7 @@ async def move_select_dest_zone_callback(update: Update, context: ContextTypes.D
     lang = get_user_lang(context)
 
     try:
-        dest_zone_id = query.data.split('|')[1]
+        dest_zone_id = query.data.partition('|')[2]
         rid = context.user_data['move_record_rid']
         record = context.user_data.get("records", {}).get(rid)
         if not record: raise ValueError("Source record not found")
@@ -5843,7 +6103,7 @@ async def move_select_dest_zone_callback(update: Update, context: ContextTypes.D
         text = get_text('messages.move_record_ask_delete', lang, source_zone_name=source_zone_name)
         await send_or_edit(update, context, text, InlineKeyboardMarkup(buttons))
     else:
-        error_msg = res.get('errors', [{}])[0].get('message', 'Unknown error')
+        error_msg = get_api_error_message(res)
         await send_or_edit(update, context, get_text('messages.error_creating_record', lang, error=error_msg))
 
 async def move_delete_source_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -5853,7 +6113,7 @@ async def move_delete_source_callback(update: Update, context: ContextTypes.DEFA
     lang = get_user_lang(context)
 
     try:
-        rid = query.data.split('|')[1]
+        rid = query.data.partition('|')[2]
         token = get_current_token(context)
         zone_id = context.user_data.get('selected_zone_id')
     except (IndexError, KeyError):
@@ -5867,7 +6127,7 @@ async def move_delete_source_callback(update: Update, context: ContextTypes.DEFA
         await send_or_edit(update, context, get_text('messages.error_deleting_record', lang))
 
     for key in ['move_record_rid', 'move_dest_account_nickname']: context.user_data.pop(key, None)
-    context.user_data.pop('all_records', None)
+    invalidate_records_list(context)
     await asyncio.sleep(2)
     await display_records_list(update, context)
 
@@ -5880,10 +6140,18 @@ async def move_copy_complete_callback(update: Update, context: ContextTypes.DEFA
     await send_or_edit(update, context, get_text('messages.move_record_copy_complete', lang))
 
     for key in ['move_record_rid', 'move_dest_account_nickname']: context.user_data.pop(key, None)
-    context.user_data.pop('all_records', None)
+    invalidate_records_list(context)
     await asyncio.sleep(2)
     await display_records_list(update, context)
 
+CHANGE_TYPE_ROWS = tuple(tuple(row) for row in chunk_list(DNS_RECORD_TYPES, 3))
+
+def change_type_keyboard(rid: str, lang: str) -> InlineKeyboardMarkup:
+    """The record-type picker for changing one record's type; the row layout is fixed, only the rid-bearing buttons are built per call."""
+    buttons = [[InlineKeyboardButton(t, callback_data=f"change_type_select|{rid}|{t}") for t in row] for row in CHANGE_TYPE_ROWS]
+    buttons.append([InlineKeyboardButton(get_text('buttons.cancel', lang), callback_data=f"select|{rid}")])
+    return InlineKeyboardMarkup(buttons)
+
 async def change_record_type_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Displays a list of all possible DNS record types for the user to choose from."""
     query = update.callback_query
@@ -5891,18 +6159,14 @@ async def change_record_type_callback(update: Update, context: ContextTypes.DEFA
     lang = get_user_lang(context)
 
     try:
-        rid = query.data.split('|')[1]
+        rid = query.data.partition('|')[2]
         record = context.user_data.get("records", {}).get(rid)
         if not record: raise ValueError("Record not found")
     except (IndexError, ValueError):
         await send_or_edit(update, context, get_text('messages.internal_error', lang)); return
 
-    buttons = [InlineKeyboardButton(t, callback_data=f"change_type_select|{rid}|{t}") for t in DNS_RECORD_TYPES]
-    buttons_in_rows = chunk_list(buttons, 3)
-    buttons_in_rows.append([InlineKeyboardButton(get_text('buttons.cancel', lang), callback_data=f"select|{rid}")])
-
     text = get_text('prompts.choose_new_record_type', lang, record_name=escape_html(record['name']))
-    await send_or_edit(update, context, text, InlineKeyboardMarkup(buttons_in_rows))
+    await send_or_edit(update, context, text, change_type_keyboard(rid, lang))
 
 async def change_record_type_select_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handles the user's selection of a new record type and prompts for the new content."""
@@ -5923,7 +6187,7 @@ async def change_record_type_select_callback(update: Update, context: ContextTyp
     }
 
     prompt_key = 'prompts.enter_new_content_for_record'
-    if new_type in ['A', 'AAAA']:
+    if new_type in IP_RECORD_TYPES:
         prompt_key = 'prompts.enter_new_ip_for_record'
     elif new_type == 'CNAME':
         prompt_key = 'prompts.enter_new_cname_for_record'
@@ -5933,14 +6197,14 @@ async def change_record_type_select_callback(update: Update, context: ContextTyp
 
 async def edit_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     lang = get_user_lang(context)
-    rid = update.callback_query.data.split('|')[1]
+    rid = update.callback_query.data.partition('|')[2]
     record = context.user_data.get("records", {}).get(rid)
     if not record:
         await update.callback_query.message.reply_text(get_text('messages.internal_error', lang)); return
     context.user_data["edit"] = {"id": record["id"], "type": record["type"], "name": record["name"], "old": record["content"]}
     zone_name = context.user_data.get('selected_zone_name', '')
     record_short_name = get_short_name(record['name'], zone_name)
-    prompt_key = 'prompts.enter_ip' if record['type'] in ['A', 'AAAA'] else 'prompts.enter_content'
+    prompt_key = 'prompts.enter_ip' if record['type'] in IP_RECORD_TYPES else 'prompts.enter_content'
 
     safe_short_name = escape_html(record_short_name)
     prompt_text = get_text(prompt_key, lang, name=f"<code>{safe_short_name}</code>")
@@ -5948,7 +6212,7 @@ async def edit_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 async def toggle_proxy_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     lang = get_user_lang(context)
-    rid = update.callback_query.data.split('|')[1]
+    rid = update.callback_query.data.partition('|')[2]
     record = context.user_data.get("records", {}).get(rid)
     current_status = get_text('messages.proxy_status_active', lang) if record.get('proxied') else get_text('messages.proxy_status_inactive', lang)
     new_status = get_text('messages.proxy_status_inactive', lang) if record.get('proxied') else get_text('messages.proxy_status_active', lang)
@@ -5962,7 +6226,7 @@ async def toggle_proxy_confirm_callback(update: Update, context: ContextTypes.DE
     lang = get_user_lang(context)
     token = get_current_token(context)
     if not token: return
-    rid = update.callback_query.data.split('|')[1]
+    rid = update.callback_query.data.partition('|')[2]
     record = context.user_data.get("records", {}).get(rid)
     new_proxied_status = not record.get('proxied', False)
     provider = get_current_provider(context)
@@ -5972,18 +6236,18 @@ async def toggle_proxy_confirm_callback(update: Update, context: ContextTypes.DE
     res = await set_provider_record_proxy(provider, token, zone_id, updated_record, new_proxied_status)
     if res.get("success"):
         await update.callback_query.answer(get_text('messages.proxy_toggled_successfully', lang, record_name=record['name']), show_alert=True)
-        context.user_data.pop('all_records', None)
-        context.user_data.pop('records_list_cache', None)
-        context.user_data.pop('records', None)
-        context.user_data['selected_record_id_for_view'] = rid
-        await select_callback(update, context)
+        # The cached list, the id index and the search view share this dict, so one in-place update refreshes them all.
+        record['proxied'] = new_proxied_status
+        if isinstance(record.get('raw'), dict) and 'cloud' in record['raw']:
+            record['raw'] = {**record['raw'], 'cloud': new_proxied_status}
+        await show_record_view(update, context, rid)
     else:
-        error_msg = res.get('errors', [{}])[0].get('message', get_text('messages.error_toggling_proxy', lang))
+        error_msg = get_api_error_message(res, get_text('messages.error_toggling_proxy', lang))
         await update.callback_query.answer(error_msg, show_alert=True)
 
 async def delete_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     lang = get_user_lang(context)
-    rid = update.callback_query.data.split('|')[1]
+    rid = update.callback_query.data.partition('|')[2]
     record = context.user_data.get("records", {}).get(rid)
     kb = [[InlineKeyboardButton(get_text('buttons.confirm_action', lang), callback_data=f"delete_confirm|{rid}")],
           [InlineKeyboardButton(get_text('buttons.cancel_action', lang), callback_data=f"select|{rid}")]]
@@ -5997,7 +6261,7 @@ async def delete_confirm_callback(update: Update, context: ContextTypes.DEFAULT_
     lang = get_user_lang(context)
     token = get_current_token(context)
     if not token: return
-    rid = update.callback_query.data.split('|')[1]
+    rid = update.callback_query.data.partition('|')[2]
     record = context.user_data.get("records", {}).get(rid, {})
     res = await delete_provider_record(get_current_provider(context), token, context.user_data['selected_zone_id'], rid)
     if res.get("success"):
@@ -6006,7 +6270,7 @@ async def delete_confirm_callback(update: Update, context: ContextTypes.DEFAULT_
             get_text('messages.record_deleted_successfully', lang, record_name=f"<code>{safe_name}</code>"),
             parse_mode="HTML"
         )
-        context.user_data.pop('all_records', None)
+        cache_record_deleted(context, rid)
         await asyncio.sleep(1)
         await display_records_list(update, context)
     else:
@@ -6049,21 +6313,24 @@ async def confirm_change_callback(update: Update, context: ContextTypes.DEFAULT_
             parse_mode="HTML"
         )
 
-        context.user_data.pop('all_records', None)
-        context.user_data.pop('records_list_cache', None)
-        context.user_data.pop('records', None)
+        cache_record_saved(context, provider, zone_id, record_id, res)
 
         await asyncio.sleep(1)
 
         original_update = context.user_data.pop('last_text_update', update)
-        context.user_data['selected_record_id_for_view'] = record_id
-
-        await select_callback(original_update, context, force_new_message=True)
+        await show_record_view(original_update, context, record_id, force_new_message=True)
 
     else:
-        error_msg = res.get('errors', [{}])[0].get('message', 'Unknown error')
+        error_msg = get_api_error_message(res)
         await query.edit_message_text(get_text('messages.error_updating_record', lang, error=error_msg))
 
+@lru_cache(maxsize=None)
+def add_type_keyboard(lang: str) -> InlineKeyboardMarkup:
+    """The record-type picker shown by the Add flow, built once per language."""
+    buttons = chunk_list([InlineKeyboardButton(t, callback_data=f"add_type|{t}") for t in DNS_RECORD_TYPES], 3)
+    buttons.append([InlineKeyboardButton(get_text('buttons.back_to_list', lang), callback_data="back_to_records_list")])
+    return InlineKeyboardMarkup(buttons)
+
 async def add_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if not is_admin(update): return
     lang = get_user_lang(context)
@@ -6075,17 +6342,14 @@ async def add_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
         if query: await query.answer(msg, show_alert=True)
         else: await message_source.reply_text(msg)
         return
-    clear_state(context, preserve=['language', 'selected_provider', 'selected_account_nickname', 'all_zones', 'selected_zone_id', 'selected_zone_name', 'all_records', 'records'])
-    buttons = [InlineKeyboardButton(t, callback_data=f"add_type|{t}") for t in DNS_RECORD_TYPES]
-    buttons_3col = chunk_list(buttons, 3)
-    buttons_3col.append([InlineKeyboardButton(get_text('buttons.back_to_list', lang), callback_data="back_to_records_list")])
-    reply_markup = InlineKeyboardMarkup(buttons_3col)
+    clear_state(context, preserve=RECORDS_STATE_KEYS)
+    reply_markup = add_type_keyboard(lang)
     text = get_text('prompts.choose_record_type', lang)
     if query: await query.edit_message_text(text, reply_markup=reply_markup)
     else: await message_source.reply_text(text, reply_markup=reply_markup)
 
 async def add_type_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    context.user_data["new_type"] = update.callback_query.data.split('|')[1]
+    context.user_data["new_type"] = update.callback_query.data.partition('|')[2]
     context.user_data["add_step"] = "name"
     await update.callback_query.edit_message_text(get_text('prompts.enter_subdomain', get_user_lang(context)))
 
@@ -6093,20 +6357,21 @@ async def add_proxied_callback(update: Update, context: ContextTypes.DEFAULT_TYP
     lang = get_user_lang(context)
     token = get_current_token(context)
     if not token: return
-    proxied = update.callback_query.data.split('|')[1].lower() == "true"
+    proxied = update.callback_query.data.partition('|')[2].lower() == "true"
     rtype, name, content = context.user_data.pop("new_type"), context.user_data.pop("new_name"), context.user_data.pop("new_content")
-    res = await create_provider_record(get_current_provider(context), token, context.user_data['selected_zone_id'], rtype, name, content, proxied)
+    provider, zone_id = get_current_provider(context), context.user_data['selected_zone_id']
+    res = await create_provider_record(provider, token, zone_id, rtype, name, content, proxied)
     if res.get("success"):
         safe_name = escape_html(name)
         await update.callback_query.edit_message_text(
             get_text('messages.record_added_successfully', lang, rtype=rtype, name=f"<code>{safe_name}</code>"),
             parse_mode="HTML"
         )
-        context.user_data.pop('all_records', None)
+        cache_record_saved(context, provider, zone_id, None, res)
         await asyncio.sleep(1)
         await display_records_list(update, context)
     else:
-        error_msg = res.get('errors', [{}])[0].get('message', 'Unknown error')
+        error_msg = get_api_error_message(res)
         await update.callback_query.edit_message_text(get_text('messages.error_creating_record', lang, error=error_msg))
 
 async def add_retry_name_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -6125,7 +6390,7 @@ async def search_menu_callback(update: Update, context: ContextTypes.DEFAULT_TYP
 async def search_by_name_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     lang = get_user_lang(context)
     query = update.callback_query
-    clear_state(context, preserve=['language', 'selected_provider', 'selected_account_nickname', 'all_zones', 'selected_zone_id', 'selected_zone_name', 'all_records', 'records'])
+    clear_state(context, preserve=RECORDS_STATE_KEYS)
     context.user_data['is_searching'] = True
     text = get_text('prompts.enter_search_query', lang)
     kb = InlineKeyboardMarkup([[InlineKeyboardButton(get_text('buttons.cancel_search', lang), callback_data="back_to_records_list")]])
@@ -6134,7 +6399,7 @@ async def search_by_name_callback(update: Update, context: ContextTypes.DEFAULT_
 async def search_by_ip_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     lang = get_user_lang(context)
     query = update.callback_query
-    clear_state(context, preserve=['language', 'selected_provider', 'selected_account_nickname', 'all_zones', 'selected_zone_id', 'selected_zone_name', 'all_records', 'records'])
+    clear_state(context, preserve=RECORDS_STATE_KEYS)
     context.user_data['is_searching_ip'] = True
     text = get_text('prompts.enter_search_query_ip', lang)
     kb = InlineKeyboardMarkup([[InlineKeyboardButton(get_text('buttons.cancel_search', lang), callback_data="back_to_records_list")]])
@@ -6142,43 +6407,89 @@ async def search_by_ip_callback(update: Update, context: ContextTypes.DEFAULT_TY
 
 async def bulk_start_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     current_view = context.user_data.get('records_in_view')
-    preserve_keys = ['language', 'selected_provider', 'selected_account_nickname', 'all_zones', 'selected_zone_id', 'selected_zone_name', 'all_records', 'records']
+    preserve_keys = RECORDS_STATE_KEYS
     if current_view is not None:
-        preserve_keys.extend(['records_in_view', 'search_query', 'search_ip_query'])
+        preserve_keys |= RECORDS_VIEW_STATE_KEYS
     clear_state(context, preserve=preserve_keys)
     context.user_data['is_bulk_mode'] = True
-    context.user_data['selected_records'] = []
+    context.user_data['selected_records'] = set()
     await display_records_list(update, context)
 
 async def bulk_cancel_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     current_page = context.user_data.get('current_page', 0)
-    preserve_keys = ['language', 'selected_provider', 'selected_account_nickname', 'all_zones', 'selected_zone_id', 'selected_zone_name', 'all_records', 'records']
+    preserve_keys = RECORDS_STATE_KEYS
     if context.user_data.get('records_in_view') is not None:
-        preserve_keys.extend(['records_in_view', 'search_query', 'search_ip_query'])
+        preserve_keys |= RECORDS_VIEW_STATE_KEYS
     clear_state(context, preserve=preserve_keys)
     await display_records_list(update, context, page=current_page)
 
 async def bulk_select_all_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
-    page = int(query.data.split('|')[1])
-    selected_records = context.user_data.get('selected_records', [])
+    page = int(query.data.partition('|')[2])
+    selected = _get_bulk_selection(context)
     records_in_view = context.user_data.get('records_in_view', context.user_data.get('all_records', []))
     all_ids_in_view = {r['id'] for r in records_in_view}
-    current_selected_set = set(selected_records)
-    if all_ids_in_view.issubset(current_selected_set):
-        current_selected_set.difference_update(all_ids_in_view)
+    if all_ids_in_view.issubset(selected):
+        selected.difference_update(all_ids_in_view)
     else:
-        current_selected_set.update(all_ids_in_view)
-    context.user_data['selected_records'] = list(current_selected_set)
+        selected.update(all_ids_in_view)
     await display_records_list(update, context, page=page)
 
+def _get_bulk_selection(context: ContextTypes.DEFAULT_TYPE) -> set:
+    """Returns the bulk-mode selection as a mutable set of record ids, upgrading a list saved by older versions."""
+    selected = context.user_data.get('selected_records')
+    if not isinstance(selected, set):
+        selected = context.user_data['selected_records'] = set(selected or ())
+    return selected
+
+def _bulk_keyboard_after_toggle(context: ContextTypes.DEFAULT_TYPE, keyboard, rid: str, page: int):
+    """
+    Returns a copy of the current bulk-mode keyboard with only the toggled record's check icon and the
+    selection-dependent labels changed, or None if the toggled button is not on it.
+    """
+    lang = get_user_lang(context)
+    selected = _get_bulk_selection(context)
+    records_in_view = context.user_data.get('records_in_view', context.user_data.get('all_records', []))
+    all_ids_in_view = {r['id'] for r in records_in_view}
+    select_all_key = 'buttons.deselect_all' if all_ids_in_view and all_ids_in_view.issubset(selected) else 'buttons.select_all'
+    label_updates = {
+        f"bulk_select_all|{page}": get_text(select_all_key, lang),
+        "bulk_change_ip_start": get_text('buttons.change_ip_selected', lang, count=len(selected)),
+        "bulk_delete_confirm": get_text('buttons.delete_selected', lang, count=len(selected)),
+    }
+    toggled_data = f"bulk_select|{rid}|{page}"
+    old_icon, new_icon = (CHECK_OFF_ICON, CHECK_ON_ICON) if rid in selected else (CHECK_ON_ICON, CHECK_OFF_ICON)
+
+    found, rows = False, []
+    for row in keyboard:
+        new_row = []
+        for button in row:
+            if button.callback_data == toggled_data:
+                button = InlineKeyboardButton(button.text.replace(old_icon, new_icon, 1), callback_data=toggled_data)
+                found = True
+            elif button.callback_data in label_updates:
+                button = InlineKeyboardButton(label_updates[button.callback_data], callback_data=button.callback_data)
+            new_row.append(button)
+        rows.append(new_row)
+    return InlineKeyboardMarkup(rows) if found else None
+
 async def bulk_select_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    rid, page = update.callback_query.data.split('|')[1], int(update.callback_query.data.split('|')[2])
-    selected = context.user_data.get('selected_records', [])
-    if rid in selected: selected.remove(rid)
-    else: selected.append(rid)
-    context.user_data['selected_records'] = selected
-    await display_records_list(update, context, page=page)
+    query = update.callback_query
+    rid, page = query.data.split('|')[1], int(query.data.split('|')[2])
+    selected = _get_bulk_selection(context)
+    if rid in selected: selected.discard(rid)
+    else: selected.add(rid)
+
+    current_markup = getattr(query.message, 'reply_markup', None) if query.message else None
+    new_markup = _bulk_keyboard_after_toggle(context, current_markup.inline_keyboard, rid, page) if current_markup else None
+    if not new_markup:
+        await display_records_list(update, context, page=page)
+        return
+    try:
+        await query.edit_message_reply_markup(reply_markup=new_markup)
+    except error.BadRequest as e:
+        if "Message is not modified" not in str(e):
+            logger.error(f"Error updating bulk selection keyboard: {e}")
 
 async def bulk_delete_confirm_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     lang = get_user_lang(context)
@@ -6194,20 +6505,26 @@ async def bulk_delete_execute_callback(update: Update, context: ContextTypes.DEF
     lang = get_user_lang(context)
     token = get_current_token(context)
     if not token: return
-    selected_ids = context.user_data.get('selected_records', [])
+    selected_ids = list(context.user_data.get('selected_records', ()))
     query = update.callback_query
     await query.edit_message_text(get_text('messages.bulk_delete_progress', lang, count=len(selected_ids)))
-    success, fail = 0, 0
-    zone_id = context.user_data['selected_zone_id']
-    for rid in selected_ids:
-        res = await delete_provider_record(get_current_provider(context), token, zone_id, rid)
-        if res.get("success"): success += 1
-        else: fail += 1
-        await asyncio.sleep(0.3)
+    zone_id, provider = context.user_data['selected_zone_id'], get_current_provider(context)
+    if provider == 'cloudflare':
+        success = await cloudflare_batch_dns(
+            token, zone_id, "deletes", [{"id": rid} for rid in selected_ids],
+            lambda item: delete_record(token, zone_id, item["id"])
+        )
+    else:
+        results = await run_bulk_dns_calls(delete_provider_record(provider, token, zone_id, rid) for rid in selected_ids)
+        success = sum(1 for res in results if res.get("success"))
+    fail = len(selected_ids) - success
     msg = get_text('messages.bulk_delete_report', lang, success=success, fail=fail)
     kb = [[InlineKeyboardButton(get_text('buttons.back_to_list', lang), callback_data="back_to_records_list")]]
     await query.edit_message_text(msg, reply_markup=InlineKeyboardMarkup(kb), parse_mode="HTML")
-    clear_state(context, preserve=['language', 'selected_provider', 'selected_account_nickname', 'all_zones', 'selected_zone_id', 'selected_zone_name'])
+    # Only a fully successful run tells us exactly which records are gone; otherwise re-fetch on the next render.
+    if not fail:
+        cache_records_deleted(context, selected_ids)
+    clear_state(context, preserve=RECORDS_STATE_KEYS if not fail else ZONE_STATE_KEYS)
 
 async def bulk_change_ip_start_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     lang = get_user_lang(context)
@@ -6226,31 +6543,39 @@ async def bulk_change_ip_execute_callback(update: Update, context: ContextTypes.
     if not details:
         await query.edit_message_text(get_text('messages.internal_error', lang)); return
     new_ip, record_ids = details['new_ip'], details['record_ids']
+    all_records_map, zone_id = context.user_data.get("records", {}), context.user_data['selected_zone_id']
+    provider = get_current_provider(context)
+
+    known_records = [all_records_map[rid] for rid in record_ids if rid in all_records_map]
+    to_update = [r for r in known_records if r['type'] in IP_RECORD_TYPES]
+    skipped = len(known_records) - len(to_update)
+
     safe_new_ip = escape_html(new_ip)
-    await query.edit_message_text(get_text('messages.bulk_change_ip_progress', lang, count=len(record_ids), new_ip=f"<code>{safe_new_ip}</code>"),
+    await query.edit_message_text(get_text('messages.bulk_change_ip_progress', lang, count=len(to_update), new_ip=f"<code>{safe_new_ip}</code>"),
                                   parse_mode="HTML")
 
-    success, fail, skipped = 0, 0, 0
-    all_records_map, zone_id = context.user_data.get("records", {}), context.user_data['selected_zone_id']
-    for rid in record_ids:
-        record = all_records_map.get(rid)
-        if not record: fail += 1; continue
-        if record['type'] in ['A', 'AAAA']:
-            provider = get_current_provider(context)
-            updated_record = dict(record)
-            updated_record["content"] = new_ip
-            res = await update_provider_record(provider, token, zone_id, updated_record, new_ip)
-            if res.get("success"): success += 1
-            else: fail += 1
-        else: skipped += 1
-        await asyncio.sleep(0.3)
+    if provider == 'cloudflare':
+        success = await cloudflare_batch_dns(
+            token, zone_id, "patches", [{"id": r['id'], "content": new_ip} for r in to_update],
+            lambda item: patch_record_content(token, zone_id, item["id"], item["content"])
+        )
+    else:
+        results = await run_bulk_dns_calls(
+            update_provider_record(provider, token, zone_id, {**r, "content": new_ip}, new_ip) for r in to_update
+        )
+        success = sum(1 for res in results if res.get("success"))
+    fail = len(record_ids) - success - skipped
     msg = get_text('messages.bulk_change_ip_report', lang, success=success, skipped=skipped, fail=fail)
     kb = [[InlineKeyboardButton(get_text('buttons.back_to_list', lang), callback_data="back_to_records_list")]]
     await query.edit_message_text(msg, reply_markup=InlineKeyboardMarkup(kb), parse_mode="HTML")
-    clear_state(context, preserve=['language', 'selected_provider', 'selected_account_nickname', 'all_zones', 'selected_zone_id', 'selected_zone_name'])
+    # The list, the id index and the search view share these dicts, so patching them in place updates the cached listing.
+    if not fail:
+        for r in to_update:
+            r['content'] = new_ip
+    clear_state(context, preserve=RECORDS_STATE_KEYS if not fail else ZONE_STATE_KEYS)
 
 async def set_lang_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    lang_code = update.callback_query.data.split('|')[1]
+    lang_code = update.callback_query.data.partition('|')[2]
     context.user_data['language'] = lang_code
     await update.callback_query.edit_message_text(get_text('messages.language_changed', lang_code))
     await asyncio.sleep(1)
@@ -6327,7 +6652,7 @@ async def lb_menu_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await query.answer()
 
     try:
-        policy_index = int(query.data.split('|')[1])
+        policy_index = int(query.data.partition('|')[2])
         context.user_data['edit_policy_index'] = policy_index
     except (IndexError, ValueError):
         if query: await query.edit_message_text("Error: Policy not found."); return
@@ -6363,7 +6688,7 @@ async def lb_toggle_enabled_callback(update: Update, context: ContextTypes.DEFAU
     query = update.callback_query
     lang = get_user_lang(context)
 
-    policy_index = int(query.data.split('|')[1])
+    policy_index = int(query.data.partition('|')[2])
     config = load_config()
     policy = config['failover_policies'][policy_index]
 
@@ -6385,7 +6710,7 @@ async def lb_edit_field_callback(update: Update, context: ContextTypes.DEFAULT_T
     await query.answer()
     lang = get_user_lang(context)
 
-    field = query.data.split('|')[1]
+    field = query.data.partition('|')[2]
     if field == 'ips':
         context.user_data['awaiting_lb_ips'] = True
         await query.edit_message_text(get_text('prompts.enter_lb_ips', lang))
@@ -6441,7 +6766,7 @@ async def health_interval_set_callback(update: Update, context: ContextTypes.DEF
     await query.answer()
     lang = get_user_lang(context)
     try:
-        interval_seconds = int(query.data.split('|')[1])
+        interval_seconds = int(query.data.partition('|')[2])
         interval_seconds = max(MIN_HEALTH_CHECK_INTERVAL_SECONDS, min(MAX_HEALTH_CHECK_INTERVAL_SECONDS, interval_seconds))
         config = load_config() or {}
         config.setdefault("settings", {})["health_check_interval_seconds"] = interval_seconds
@@ -6536,6 +6861,16 @@ async def _handle_state_health_interval(update: Update, context: ContextTypes.DE
     except Exception:
         pass
 
+# handle_text resolves an explicit user_data['state'] with one lookup here instead of walking the elif chain.
+LB_IP_TEXT_STATES = frozenset({'awaiting_lb_ip_address', 'awaiting_lb_ip_weight', 'awaiting_lb_new_ip'})
+
+# Checked after the wizard, monitor, threshold and group flows, matching the original if/elif precedence.
+TEXT_STATE_HANDLERS = {
+    'awaiting_clone_name': _handle_state_awaiting_clone_name,
+    'awaiting_notification_recipient': _handle_state_notification_recipient,
+    'awaiting_health_check_interval': _handle_state_health_interval,
+}
+
 async def monitor_toggle_enabled_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Enables/disables a standalone monitor without deleting it."""
     query = update.callback_query
@@ -7137,7 +7472,7 @@ async def lb_ip_edit_menu(update: Update, context: ContextTypes.DEFAULT_TYPE, fo
     try:
         ip_index = -1
         if query and query.data and "lb_ip_select|" in query.data:
-            ip_index = int(query.data.split('|')[1])
+            ip_index = int(query.data.partition('|')[2])
 
         if ip_index == -1: raise KeyError("Could not determine which item to edit.")
 
@@ -7245,7 +7580,7 @@ async def lb_add_item_list_select_account_callback(update: Update, context: Cont
     lang = get_user_lang(context)
 
     try:
-        nickname = query.data.split('|')[1]
+        nickname = query.data.partition('|')[2]
         token = CF_ACCOUNTS.get(nickname)
         if not token:
             await query.edit_message_text("Error: Account token not found.")
@@ -7284,7 +7619,7 @@ async def lb_add_item_list_select_zone_callback(update: Update, context: Context
     lang = get_user_lang(context)
 
     try:
-        zone_id = query.data.split('|')[1]
+        zone_id = query.data.partition('|')[2]
         token = context.user_data['lb_add_from_list_token']
 
         zones_cache = context.user_data.get('lb_add_from_list_zones_cache', [])
@@ -7409,7 +7744,7 @@ async def lb_ip_edit_start_callback(update: Update, context: ContextTypes.DEFAUL
     await query.answer()
     lang = get_user_lang(context)
 
-    edit_type = query.data.split('|')[1]
+    edit_type = query.data.partition('|')[2]
 
     if edit_type == 'address':
         try:
@@ -7477,7 +7812,7 @@ async def lb_ip_delete_prompt_callback(update: Update, context: ContextTypes.DEF
     await query.answer()
     lang = get_user_lang(context)
     try:
-        ip_index_to_delete = int(query.data.split('|')[1])
+        ip_index_to_delete = int(query.data.partition('|')[2])
 
         policy_index = context.user_data['edit_policy_index']
         config = load_config()
@@ -7503,7 +7838,7 @@ async def lb_ip_delete_confirm_callback(update: Update, context: ContextTypes.DE
     lang = get_user_lang(context)
 
     try:
-        ip_index_to_delete = int(query.data.split('|')[1])
+        ip_index_to_delete = int(query.data.partition('|')[2])
         policy_index = context.user_data.get('edit_policy_index')
 
         if policy_index is None:
@@ -7562,7 +7897,7 @@ async def lb_policy_edit_callback(update: Update, context: ContextTypes.DEFAULT_
     try:
         policy_index = context.user_data.get('edit_policy_index')
         if policy_index is None and query and '|' in query.data:
-            policy_index = int(query.data.split('|')[1])
+            policy_index = int(query.data.partition('|')[2])
 
         if policy_index is None:
             await context.bot.send_message(chat_id=update.effective_chat.id, text=get_text('messages.session_expired_error', lang))
@@ -7609,7 +7944,7 @@ async def lb_policy_edit_field_callback(update: Update, context: ContextTypes.DE
     await query.answer()
     lang = get_user_lang(context)
 
-    field_to_edit = query.data.split('|')[1]
+    field_to_edit = query.data.partition('|')[2]
 
     if field_to_edit == 'ips':
         await lb_ip_list_menu(update, context)
@@ -7644,7 +7979,7 @@ async def lb_policy_set_zone_callback(update: Update, context: ContextTypes.DEFA
         await query.edit_message_text(get_text('messages.session_expired_error', lang))
         return
 
-    zone_name = query.data.split('|')[1]
+    zone_name = query.data.partition('|')[2]
     context.user_data['new_policy_data']['zone_name'] = zone_name
 
     context.user_data['add_policy_step'] = 'ask_lb_ips_method'
@@ -7693,7 +8028,7 @@ async def lb_policy_view_callback(update: Update, context: ContextTypes.DEFAULT_
     try:
         policy_index = context.user_data.get('edit_policy_index')
         if policy_index is None and query and '|' in query.data:
-            policy_index = int(query.data.split('|')[1])
+            policy_index = int(query.data.partition('|')[2])
         if policy_index is None:
             await send_or_edit(update, context, get_text('messages.session_expired_error', lang)); return
 
@@ -7772,7 +8107,7 @@ async def lb_policy_toggle_callback(update: Update, context: ContextTypes.DEFAUL
     lang = get_user_lang(context)
 
     try:
-        policy_index = int(query.data.split('|')[1])
+        policy_index = int(query.data.partition('|')[2])
         config = load_config()
 
         is_enabled = config['load_balancer_policies'][policy_index].get('enabled', True)
@@ -7798,7 +8133,7 @@ async def lb_policy_delete_callback(update: Update, context: ContextTypes.DEFAUL
     await query.answer()
     lang = get_user_lang(context)
     try:
-        policy_index = int(query.data.split('|')[1])
+        policy_index = int(query.data.partition('|')[2])
         config = load_config()
         policy_name = config['load_balancer_policies'][policy_index]['policy_name']
     except (IndexError, ValueError):
@@ -7821,7 +8156,7 @@ async def lb_policy_delete_confirm_callback(update: Update, context: ContextType
     await query.answer()
     lang = get_user_lang(context)
     try:
-        policy_index = int(query.data.split('|')[1])
+        policy_index = int(query.data.partition('|')[2])
         config = load_config()
         policy = config['load_balancer_policies'].pop(policy_index)
         save_config(config)
@@ -8047,7 +8382,7 @@ async def failover_policy_set_zone_callback(update: Update, context: ContextType
         await query.edit_message_text(get_text('messages.session_expired_error', lang))
         return
 
-    zone_name = query.data.split('|')[1]
+    zone_name = query.data.partition('|')[2]
     context.user_data['new_policy_data']['zone_name'] = zone_name
 
     context.user_data['add_policy_step'] = 'primary_ip'
@@ -8102,7 +8437,7 @@ async def failover_policy_view_callback(update: Update, context: ContextTypes.DE
     try:
         policy_index = context.user_data.get('edit_policy_index')
         if policy_index is None and query and '|' in query.data:
-            policy_index = int(query.data.split('|')[1])
+            policy_index = int(query.data.partition('|')[2])
 
         if policy_index is None:
             await send_or_edit(update, context, get_text('messages.session_expired_error', lang)); return
@@ -8164,7 +8499,7 @@ async def failover_policy_edit_callback(update: Update, context: ContextTypes.DE
     try:
         policy_index = context.user_data.get('edit_policy_index')
         if policy_index is None and query and '|' in query.data:
-            policy_index = int(query.data.split('|')[1])
+            policy_index = int(query.data.partition('|')[2])
 
         if policy_index is None:
             await context.bot.send_message(chat_id=update.effective_chat.id, text=get_text('messages.session_expired_error', lang)); return
@@ -8205,7 +8540,7 @@ async def copy_monitoring_confirm_callback(update: Update, context: ContextTypes
     lang = get_user_lang(context)
 
     try:
-        policy_index = int(query.data.split('|')[1])
+        policy_index = int(query.data.partition('|')[2])
         config = load_config()
         policy = config['failover_policies'][policy_index]
 
@@ -8234,7 +8569,7 @@ async def policy_edit_callback(update: Update, context: ContextTypes.DEFAULT_TYP
         await query.answer()
 
     try:
-        policy_index = int(query.data.split('|')[1])
+        policy_index = int(query.data.partition('|')[2])
         context.user_data['edit_policy_index'] = policy_index
     except (IndexError, ValueError):
         if query: await query.edit_message_text("Error: Policy not found."); return
@@ -8280,7 +8615,7 @@ async def failover_policy_edit_field_callback(update: Update, context: ContextTy
     await query.answer()
     lang = get_user_lang(context)
 
-    field_to_edit = query.data.split('|')[1]
+    field_to_edit = query.data.partition('|')[2]
 
     if field_to_edit == 'record_names':
         context.user_data['is_editing_policy_records'] = True
@@ -8303,7 +8638,7 @@ async def failover_policy_delete_callback(update: Update, context: ContextTypes.
     await query.answer()
     lang = get_user_lang(context)
     try:
-        policy_index = int(query.data.split('|')[1])
+        policy_index = int(query.data.partition('|')[2])
         config = load_config()
         policy_name = config['failover_policies'][policy_index]['policy_name']
     except (IndexError, ValueError):
@@ -8327,7 +8662,7 @@ async def failover_policy_delete_confirm_callback(update: Update, context: Conte
     await query.answer()
     lang = get_user_lang(context)
     try:
-        policy_index = int(query.data.split('|')[1])
+        policy_index = int(query.data.partition('|')[2])
         config = load_config()
         policy = config['failover_policies'].pop(policy_index)
         save_config(config)
@@ -8545,7 +8880,7 @@ async def wizard_select_account_callback(update: Update, context: ContextTypes.D
     lang = get_user_lang(context)
 
     try:
-        nickname = query.data.split('|')[1]
+        nickname = query.data.partition('|')[2]
         context.user_data['wizard_data']['account_nickname'] = nickname
         token = CF_ACCOUNTS.get(nickname)
         logger.info(f"WIZARD: Account '{nickname}' selected. Fetching zones...")
@@ -8590,7 +8925,7 @@ async def wizard_select_zone_callback(update: Update, context: ContextTypes.DEFA
     context.user_data['last_callback_query'] = query
     await query.answer()
     try:
-        zone_id = query.data.split('|')[1]
+        zone_id = query.data.partition('|')[2]
         zone_name = context.user_data['wizard_zones_cache'][zone_id]['name']
         context.user_data['wizard_data']['zone_name'] = zone_name
     except (IndexError, KeyError):
@@ -8788,7 +9123,7 @@ async def wizard_set_type_callback(update: Update, context: ContextTypes.DEFAULT
     lang = get_user_lang(context)
 
     try:
-        policy_type = query.data.split('|')[1]
+        policy_type = query.data.partition('|')[2]
     except IndexError:
         await query.edit_message_text("An error occurred. Please try again.")
         return
@@ -8969,7 +9304,7 @@ async def status_select_policy_callback(update: Update, context: ContextTypes.DE
     lang = get_user_lang(context)
 
     try:
-        policy_global_index = int(query.data.split('|')[1])
+        policy_global_index = int(query.data.partition('|')[2])
 
         config = load_config()
         failover_policies = config.get("failover_policies", [])
@@ -9109,12 +9444,11 @@ async def sync_dns_with_config(context: ContextTypes.DEFAULT_TYPE):
 
             zone_identifier = zone_name
             if provider == 'cloudflare':
-                zones = await get_all_zones(token)
-                zone_identifier = next((z['id'] for z in zones if z['name'] == zone_name), None)
+                zone_identifier = await get_zone_id(token, zone_name)
                 if not zone_identifier:
                     logger.warning(f"Skipping sync for policy '{policy_name}': Could not find zone ID."); continue
 
-            all_dns_records = await get_provider_dns_records(provider, token, zone_identifier)
+            all_dns_records = await get_provider_dns_records(provider, token, zone_identifier, use_cache=False)
             for record in all_dns_records:
                 short_name = get_short_name(record['name'], zone_name)
                 if short_name in record_names and record.get('content') != target_ip:
@@ -9139,8 +9473,7 @@ async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 async def language_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     lang = get_user_lang(context)
-    kb = [[InlineKeyboardButton("🇮🇷 فارسی", callback_data="set_lang|fa"), InlineKeyboardButton("🇬🇧 English", callback_data="set_lang|en")]]
-    await update.message.reply_text(get_text('messages.choose_language', lang), reply_markup=InlineKeyboardMarkup(kb))
+    await update.message.reply_text(get_text('messages.choose_language', lang), reply_markup=LANGUAGE_PICKER_MARKUP)
 
 async def list_records_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if not is_admin(update): return
@@ -9168,17 +9501,13 @@ async def backup_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if not token or not zone_id:
         await update.message.reply_text(get_text('messages.no_zone_selected', lang)); return
     await update.message.reply_text(get_text('messages.backup_in_progress', lang))
-    records = await get_provider_dns_records(get_current_provider(context), token, zone_id)
+    records = await get_provider_dns_records(get_current_provider(context), token, zone_id, use_cache=False)
     if not records:
         await update.message.reply_text(get_text('messages.no_records_found', lang)); return
-    os.makedirs(BACKUP_DIR, exist_ok=True)
     backup_file_name = f"{context.user_data.get('selected_account_nickname', 'cf')}_{context.user_data['selected_zone_name']}_backup.json"
-    backup_file_path = os.path.join(BACKUP_DIR, backup_file_name)
-    try:
-        with open(backup_file_path, "w", encoding='utf-8') as f: json.dump(records, f, indent=2)
-        with open(backup_file_path, "rb") as f: await update.message.reply_document(f, filename=backup_file_name)
-    finally:
-        if os.path.exists(backup_file_path): os.remove(backup_file_path)
+    bio = io.BytesIO(orjson.dumps(records, option=orjson.OPT_INDENT_2))
+    bio.name = backup_file_name
+    await update.message.reply_document(document=bio, filename=backup_file_name)
 
 async def restore_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if not is_admin(update): return
@@ -9206,7 +9535,7 @@ async def handle_document(update: Update, context: ContextTypes.DEFAULT_TYPE):
             return
 
     try:
-        maybe_payload = json.loads(file_content)
+        maybe_payload = orjson.loads(file_content)
         if isinstance(maybe_payload, dict) and maybe_payload.get('backup_type') == SETTINGS_BACKUP_TYPE:
             await update.message.reply_text(
                 "📦 این فایل بکاپ تنظیمات ربات است.\n"
@@ -9223,17 +9552,25 @@ async def handle_document(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if not token or not zone_id:
         await update.message.reply_text(get_text('messages.no_zone_selected_for_restore', lang)); return
     await update.message.reply_text(get_text('messages.restore_in_progress', lang))
-    existing_records = await get_provider_dns_records(get_current_provider(context), token, zone_id)
-    existing_map = {(r["type"], r["name"]): r for r in existing_records}
-    restored, skipped, failed = 0, 0, 0
-    for r in backup_records:
-        if (r["type"], r["name"]) in existing_map: skipped += 1; continue
-        res = await create_provider_record(get_current_provider(context), token, zone_id, r["type"], r["name"], r["content"], r.get("proxied", False))
-        if res.get("success"): restored += 1
-        else: failed += 1
-        await asyncio.sleep(0.3)
+    provider = get_current_provider(context)
+    existing_records = await get_provider_dns_records(provider, token, zone_id, use_cache=False)
+    existing_keys = {(r["type"], r["name"]) for r in existing_records}
+    to_create = [r for r in backup_records if (r["type"], r["name"]) not in existing_keys]
+    skipped = len(backup_records) - len(to_create)
+    if provider == 'cloudflare':
+        restored = await cloudflare_batch_dns(
+            token, zone_id, "posts",
+            [{"type": r["type"], "name": r["name"], "content": r["content"], "ttl": 1, "proxied": r.get("proxied", False)} for r in to_create],
+            lambda item: create_record(token, zone_id, item["type"], item["name"], item["content"], item["proxied"])
+        )
+    else:
+        results = await run_bulk_dns_calls(
+            create_provider_record(provider, token, zone_id, r["type"], r["name"], r["content"], r.get("proxied", False)) for r in to_create
+        )
+        restored = sum(1 for res in results if res.get("success"))
+    failed = len(to_create) - restored
     await update.message.reply_text(get_text('messages.restore_report', lang, restored=restored, skipped=skipped, failed=failed))
-    context.user_data.pop('all_records', None)
+    invalidate_records_list(context)
     await display_records_list(update, context)
 
 async def post_startup_tasks(application: Application):
@@ -9241,14 +9578,19 @@ async def post_startup_tasks(application: Application):
     Runs all necessary tasks after the application has been fully initialized.
     This function is called by the `post_init` argument in Application.builder().
     """
-    await set_bot_commands(application)
-    await clear_monitoring_state_on_startup(application)
+    await asyncio.gather(set_bot_commands(application), clear_monitoring_state_on_startup(application), drop_persisted_record_caches(application))
 
     job_queue = application.job_queue
 
+    if CF_ACCOUNTS and not job_queue.get_jobs_by_name("warm_zone_id_cache_job"):
+        job_queue.run_once(warm_zone_id_cache_job, 1, name="warm_zone_id_cache_job")
+
     if not job_queue.get_jobs_by_name("startup_sync_job"):
         job_queue.run_once(sync_dns_with_config, 5, name="startup_sync_job")
 
+    if DNS_RECORDS_CACHE_TTL and DNS_RECORDS_REFRESH_WINDOW and not job_queue.get_jobs_by_name("refresh_dns_records_cache_job"):
+        job_queue.run_repeating(refresh_dns_records_cache_job, interval=max(10, DNS_RECORDS_CACHE_TTL - 10), first=30, name="refresh_dns_records_cache_job")
+
     if not job_queue.get_jobs_by_name("update_nodes_job"):
         job_queue.run_repeating(
             update_check_host_nodes_job,
@@ -9271,6 +9613,10 @@ async def post_startup_tasks(application: Application):
         )
         logger.info(f"Daily report job scheduled to run every day at {report_time} UTC.")
 
+async def post_shutdown_tasks(application: Application):
+    """Closes the shared HTTP client so pooled keep-alive connections are released cleanly."""
+    await HTTP_CLIENT.aclose()
+
 async def debug_show_logs_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """A debug command to show a summary of the latest health check run."""
     if not is_admin(update): return
@@ -9317,6 +9663,24 @@ async def debug_show_logs_command(update: Update, context: ContextTypes.DEFAULT_
 
     await send_or_edit(update, context, "\n".join(message_parts))
 
+_CALLBACK_ROUTES = {}
+
+def route_callback(key: str, callback):
+    """
+    Routes callback queries whose data is exactly `key` ("action") or starts with it ("action|").
+    The first registration for a key wins, matching the order semantics of separate handlers.
+    """
+    _CALLBACK_ROUTES.setdefault(key, callback)
+
+async def dispatch_callback_query(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Resolves a callback query to its handler with one dict lookup instead of testing every handler's regex in turn."""
+    action, sep, _ = (update.callback_query.data or "").partition('|')
+    callback = _CALLBACK_ROUTES.get(action + sep)
+    if callback:
+        await callback(update, context)
+    else:
+        logger.warning(f"No handler registered for callback data '{update.callback_query.data}'.")
+
 def main():
     """Starts the bot."""
     load_translations()
@@ -9340,6 +9704,8 @@ def main():
         .token(TELEGRAM_BOT_TOKEN) \
         .persistence(persistence) \
         .post_init(post_startup_tasks) \
+        .post_shutdown(post_shutdown_tasks) \
+        .concurrent_updates(CONCURRENT_UPDATES) \
         .build()
 
     def create_dummy_update_func(original_update, message_id, callback_data=None):
@@ -9357,6 +9723,7 @@ def main():
     application.create_dummy_update = create_dummy_update_func
 
     application.add_handler(CommandHandler("clearcommands", clear_commands_command))
+    application.add_handler(CommandHandler("refreshzones", refresh_zones_command))
     application.add_handler(CommandHandler("start", start_command))
     application.add_handler(CommandHandler("wizard", wizard_start_command))
     application.add_handler(CommandHandler("language", language_command))
@@ -9369,189 +9736,198 @@ def main():
     application.add_handler(CommandHandler("settings", settings_command))
     application.add_handler(CommandHandler("debuglogs", debug_show_logs_command))
 
-    application.add_handler(CallbackQueryHandler(lb_policy_change_algo_callback, pattern="^lb_policy_change_algo\|"))
-    application.add_handler(CallbackQueryHandler(select_account_callback, pattern="^select_account\|"))
-    application.add_handler(CallbackQueryHandler(back_to_accounts_callback, pattern="^back_to_accounts$"))
-    application.add_handler(CallbackQueryHandler(zones_page_callback, pattern="^zones_page\|"))
-    application.add_handler(CallbackQueryHandler(select_zone_callback, pattern="^select_zone\|"))
-    application.add_handler(CallbackQueryHandler(back_to_zones_callback, pattern="^back_to_zones$"))
-    application.add_handler(CallbackQueryHandler(list_page_callback, pattern="^list_page\|"))
-    application.add_handler(CallbackQueryHandler(refresh_list_callback, pattern="^refresh_list$"))
-    application.add_handler(CallbackQueryHandler(back_to_records_list_callback, pattern="^back_to_records_list$"))
-    application.add_handler(CallbackQueryHandler(select_callback, pattern="^select\|"))
-    application.add_handler(CallbackQueryHandler(change_record_type_callback, pattern="^change_type\|"))
-    application.add_handler(CallbackQueryHandler(move_record_start_callback, pattern="^move_record_start\|"))
-    application.add_handler(CallbackQueryHandler(move_select_dest_account_callback, pattern="^move_select_dest_account\|"))
-    application.add_handler(CallbackQueryHandler(move_select_dest_zone_callback, pattern="^move_select_dest_zone\|"))
-    application.add_handler(CallbackQueryHandler(move_delete_source_callback, pattern="^move_delete_source\|"))
-    application.add_handler(CallbackQueryHandler(move_copy_complete_callback, pattern="^move_copy_complete$"))
-    application.add_handler(CallbackQueryHandler(edit_callback, pattern="^edit\|"))
-    application.add_handler(CallbackQueryHandler(confirm_change_callback, pattern="^confirm_change$"))
-    application.add_handler(CallbackQueryHandler(toggle_proxy_callback, pattern="^toggle_proxy\|"))
-    application.add_handler(CallbackQueryHandler(toggle_proxy_confirm_callback, pattern="^toggle_proxy_confirm\|"))
-    application.add_handler(CallbackQueryHandler(delete_callback, pattern="^delete\|"))
-    application.add_handler(CallbackQueryHandler(delete_confirm_callback, pattern="^delete_confirm\|"))
-    application.add_handler(CallbackQueryHandler(add_callback, pattern="^add$"))
-    application.add_handler(CallbackQueryHandler(add_type_callback, pattern="^add_type\|"))
-    application.add_handler(CallbackQueryHandler(add_proxied_callback, pattern="^add_proxied\|"))
-    application.add_handler(CallbackQueryHandler(add_retry_name_callback, pattern="^add_retry_name$"))
-    application.add_handler(CallbackQueryHandler(search_menu_callback, pattern="^search_menu$"))
-    application.add_handler(CallbackQueryHandler(search_by_name_callback, pattern="^search_by_name$"))
-    application.add_handler(CallbackQueryHandler(search_by_ip_callback, pattern="^search_by_ip$"))
-    application.add_handler(CallbackQueryHandler(select_callback, pattern="^select\|"))
-    application.add_handler(CallbackQueryHandler(change_record_type_select_callback, pattern="^change_type_select\|"))
-    application.add_handler(CallbackQueryHandler(clear_logs_confirm_callback, pattern="^clear_logs_confirm$"))
-    application.add_handler(CallbackQueryHandler(clear_logs_execute_callback, pattern="^clear_logs_execute$"))
-    application.add_handler(CallbackQueryHandler(log_retention_menu_callback, pattern="^log_retention_menu$"))
-    application.add_handler(CallbackQueryHandler(set_log_retention_callback, pattern="^set_log_retention\|"))
-    application.add_handler(CallbackQueryHandler(set_alias_start_callback, pattern="^set_alias_start\|"))
-    application.add_handler(CallbackQueryHandler(set_record_alias_start_callback, pattern="^set_record_alias_start\|"))
+    route_callback("lb_policy_change_algo|", lb_policy_change_algo_callback)
+    route_callback("select_account|", select_account_callback)
+    route_callback("back_to_accounts", back_to_accounts_callback)
+    route_callback("zones_page|", zones_page_callback)
+    route_callback("select_zone|", select_zone_callback)
+    route_callback("back_to_zones", back_to_zones_callback)
+    route_callback("list_page|", list_page_callback)
+    route_callback("refresh_list", refresh_list_callback)
+    route_callback("back_to_records_list", back_to_records_list_callback)
+    route_callback("select|", select_callback)
+    route_callback("change_type|", change_record_type_callback)
+    route_callback("move_record_start|", move_record_start_callback)
+    route_callback("move_select_dest_account|", move_select_dest_account_callback)
+    route_callback("move_select_dest_zone|", move_select_dest_zone_callback)
+    route_callback("move_delete_source|", move_delete_source_callback)
+    route_callback("move_copy_complete", move_copy_complete_callback)
+    route_callback("edit|", edit_callback)
+    route_callback("confirm_change", confirm_change_callback)
+    route_callback("toggle_proxy|", toggle_proxy_callback)
+    route_callback("toggle_proxy_confirm|", toggle_proxy_confirm_callback)
+    route_callback("delete|", delete_callback)
+    route_callback("delete_confirm|", delete_confirm_callback)
+    route_callback("add", add_callback)
+    route_callback("add_type|", add_type_callback)
+    route_callback("add_proxied|", add_proxied_callback)
+    route_callback("add_retry_name", add_retry_name_callback)
+    route_callback("search_menu", search_menu_callback)
+    route_callback("search_by_name", search_by_name_callback)
+    route_callback("search_by_ip", search_by_ip_callback)
+    route_callback("change_type_select|", change_record_type_select_callback)
+    route_callback("clear_logs_confirm", clear_logs_confirm_callback)
+    route_callback("clear_logs_execute", clear_logs_execute_callback)
+    route_callback("log_retention_menu", log_retention_menu_callback)
+    route_callback("set_log_retention|", set_log_retention_callback)
+    route_callback("set_alias_start|", set_alias_start_callback)
+    route_callback("set_record_alias_start|", set_record_alias_start_callback)
     application.add_handler(CommandHandler("status", status_command))
-    application.add_handler(CallbackQueryHandler(status_refresh_callback, pattern="^status_refresh$"))
-    application.add_handler(CallbackQueryHandler(status_select_policy_callback, pattern="^status_select_policy\|"))
-    application.add_handler(CallbackQueryHandler(manual_health_check_callback, pattern="^manual_check\|"))
-    application.add_handler(CallbackQueryHandler(show_policy_log_callback, pattern="^show_policy_log\|"))
-    application.add_handler(CallbackQueryHandler(clone_policy_start_callback, pattern="^clone_policy_start\|"))
-
-    application.add_handler(CallbackQueryHandler(monitors_menu_callback, pattern="^monitors_menu$"))
-    application.add_handler(CallbackQueryHandler(monitor_add_start_callback, pattern="^monitor_add_start$"))
-    application.add_handler(CallbackQueryHandler(monitor_delete_confirm_callback, pattern="^monitor_delete_confirm\|"))
-    application.add_handler(CallbackQueryHandler(monitor_delete_execute_callback, pattern="^monitor_delete_execute\|"))
-    application.add_handler(CallbackQueryHandler(monitor_edit_menu_callback, pattern="^monitor_edit\|"))
-    application.add_handler(CallbackQueryHandler(monitor_edit_field_callback, pattern="^monitor_edit_field\|"))
-    application.add_handler(CallbackQueryHandler(monitor_toggle_enabled_callback, pattern="^monitor_toggle\\|"))
-    application.add_handler(CallbackQueryHandler(groups_menu_callback, pattern="^groups_menu$"))
-    application.add_handler(CallbackQueryHandler(group_add_start_callback, pattern="^group_add_start$"))
-    application.add_handler(CallbackQueryHandler(group_delete_confirm_callback, pattern="^group_delete_confirm\|"))
-    application.add_handler(CallbackQueryHandler(group_delete_execute_callback, pattern="^group_delete_execute\|"))
-    application.add_handler(CallbackQueryHandler(group_edit_start_callback, pattern="^group_edit_start\|"))
-    application.add_handler(CallbackQueryHandler(monitor_select_group_callback, pattern="^monitor_select_group\|"))
-    application.add_handler(CallbackQueryHandler(monitor_change_group_start_callback, pattern="^monitor_change_group_start\|"))
-    application.add_handler(CallbackQueryHandler(monitor_change_group_execute_callback, pattern="^monitor_change_group_execute\|"))
-    application.add_handler(CallbackQueryHandler(policy_change_group_start_callback, pattern="^policy_change_group_start\|"))
-    application.add_handler(CallbackQueryHandler(policy_change_group_execute_callback, pattern="^policy_change_group_execute\|"))
-    application.add_handler(CallbackQueryHandler(monitor_select_group_callback, pattern="^monitor_select_group\|"))
-    application.add_handler(CallbackQueryHandler(monitor_purge_old_ip_logs_callback, pattern="^monitor_purge_logs\|"))
-
-    application.add_handler(CallbackQueryHandler(toggle_maintenance_callback, pattern="^toggle_maintenance\|"))
-
-    application.add_handler(CallbackQueryHandler(wizard_select_account_callback, pattern="^wizard_select_account\|"))
-    application.add_handler(CallbackQueryHandler(wizard_select_zone_callback, pattern="^wizard_select_zone\|"))
-    application.add_handler(CallbackQueryHandler(wizard_set_monitoring_callback, pattern="^wizard_set_monitoring\|"))
-    application.add_handler(CallbackQueryHandler(wizard_start_callback, pattern="^wizard_start$"))
-    application.add_handler(CallbackQueryHandler(wizard_set_type_callback, pattern="^wizard_set_type\|"))
-    application.add_handler(CallbackQueryHandler(wizard_cancel_callback, pattern="^wizard_cancel$"))
-    application.add_handler(CallbackQueryHandler(wizard_lb_add_manual_callback, pattern="^wizard_lb_add_manual$"))
-
-    application.add_handler(CallbackQueryHandler(bulk_start_callback, pattern="^bulk_start$"))
-    application.add_handler(CallbackQueryHandler(bulk_cancel_callback, pattern="^bulk_cancel$"))
-    application.add_handler(CallbackQueryHandler(bulk_select_all_callback, pattern="^bulk_select_all\|"))
-    application.add_handler(CallbackQueryHandler(bulk_select_callback, pattern="^bulk_select\|"))
-    application.add_handler(CallbackQueryHandler(bulk_delete_confirm_callback, pattern="^bulk_delete_confirm$"))
-    application.add_handler(CallbackQueryHandler(bulk_delete_execute_callback, pattern="^bulk_delete_execute$"))
-    application.add_handler(CallbackQueryHandler(bulk_change_ip_start_callback, pattern="^bulk_change_ip_start$"))
-    application.add_handler(CallbackQueryHandler(bulk_change_ip_execute_callback, pattern="^bulk_change_ip_execute$"))
-
-    application.add_handler(CallbackQueryHandler(set_lang_callback, pattern="^set_lang\|"))
-    application.add_handler(CallbackQueryHandler(go_to_settings_callback, pattern="^go_to_settings$"))
-    application.add_handler(CallbackQueryHandler(back_to_settings_main_callback, pattern="^back_to_settings_main$"))
-    application.add_handler(CallbackQueryHandler(health_interval_menu_callback, pattern="^health_interval_menu$"))
-    application.add_handler(CallbackQueryHandler(health_interval_set_callback, pattern="^health_interval_set\\|"))
-    application.add_handler(CallbackQueryHandler(health_interval_custom_start_callback, pattern="^health_interval_custom_start$"))
-    application.add_handler(CallbackQueryHandler(go_to_settings_from_alert_callback, pattern="^go_to_settings_from_alert$"))
-    application.add_handler(CallbackQueryHandler(go_to_main_list_callback, pattern="^go_to_main_list$"))
-    application.add_handler(CallbackQueryHandler(go_to_settings_from_startup_callback, pattern="^go_to_settings_from_startup$"))
-    application.add_handler(CallbackQueryHandler(sync_now_callback, pattern="^sync_now$"))
-    application.add_handler(CallbackQueryHandler(reporting_menu_callback, pattern="^reporting_menu$"))
-    application.add_handler(CallbackQueryHandler(generate_report_callback, pattern="^report_generate\|"))
-
-    application.add_handler(CallbackQueryHandler(show_settings_notifications_menu, pattern="^settings_notifications$"))
-    application.add_handler(CallbackQueryHandler(notification_edit_recipients_callback, pattern="^notification_edit_recipients\|"))
-    application.add_handler(CallbackQueryHandler(notification_add_member_start_callback, pattern="^notification_add_member_start$"))
-    application.add_handler(CallbackQueryHandler(notification_remove_member_start_callback, pattern="^notification_remove_member_start$"))
-    application.add_handler(CallbackQueryHandler(notification_remove_member_execute_callback, pattern="^notification_remove_member_execute\|"))
-    application.add_handler(CallbackQueryHandler(toggle_notifications_callback, pattern="^toggle_notifications$"))
-    application.add_handler(CallbackQueryHandler(add_recipient_start_callback, pattern="^add_recipient_start$"))
-    application.add_handler(CallbackQueryHandler(remove_recipient_start_callback, pattern="^remove_recipient_start$"))
-    application.add_handler(CallbackQueryHandler(remove_recipient_confirm_callback, pattern="^remove_recipient_confirm\|"))
-    application.add_handler(CallbackQueryHandler(user_management_menu_callback, pattern="^user_management_menu$"))
-    application.add_handler(CallbackQueryHandler(admin_add_start_callback, pattern="^admin_add_start$"))
-    application.add_handler(CallbackQueryHandler(admin_remove_start_callback, pattern="^admin_remove_start$"))
-    application.add_handler(CallbackQueryHandler(admin_remove_confirm_callback, pattern="^admin_remove_confirm\|"))
-
-    application.add_handler(CallbackQueryHandler(copy_monitoring_confirm_callback, pattern="^copy_monitoring_confirm\|"))
-    application.add_handler(CallbackQueryHandler(failover_start_backup_monitoring_callback, pattern="^failover_start_backup_monitoring\|"))
-    application.add_handler(CallbackQueryHandler(settings_failover_policies_callback, pattern="^settings_failover_policies$"))
-    application.add_handler(CallbackQueryHandler(failover_policy_view_callback, pattern="^failover_policy_view\|"))
-    application.add_handler(CallbackQueryHandler(failover_policy_edit_callback, pattern="^failover_policy_edit\|"))
-    application.add_handler(CallbackQueryHandler(failover_policy_add_start_callback, pattern="^failover_policy_add_start$"))
-    application.add_handler(CallbackQueryHandler(failover_policy_delete_callback, pattern="^failover_policy_delete\|"))
-    application.add_handler(CallbackQueryHandler(failover_policy_delete_confirm_callback, pattern="^failover_policy_delete_confirm\|"))
-    application.add_handler(CallbackQueryHandler(failover_policy_edit_field_callback, pattern="^failover_policy_edit_field\|"))
-    application.add_handler(CallbackQueryHandler(failover_policy_toggle_callback, pattern="^failover_policy_toggle\|"))
-    application.add_handler(CallbackQueryHandler(failover_policy_toggle_failback_callback, pattern="^failover_policy_toggle_failback\|"))
-    application.add_handler(CallbackQueryHandler(failover_policy_set_account_callback, pattern="^failover_policy_set_account\|"))
-    application.add_handler(CallbackQueryHandler(failover_policy_set_zone_callback, pattern="^failover_policy_set_zone\|"))
-    application.add_handler(CallbackQueryHandler(add_policy_failover_manual_primary_callback, pattern="^add_policy_failover_manual_primary$"))
-    application.add_handler(CallbackQueryHandler(add_policy_failover_from_list_primary_callback, pattern="^add_policy_failover_from_list_primary$"))
-    application.add_handler(CallbackQueryHandler(add_policy_failover_select_records_callback, pattern="^add_policy_failover_select_records$"))
-
-    application.add_handler(CallbackQueryHandler(settings_lb_policies_callback, pattern="^settings_lb_policies$"))
-    application.add_handler(CallbackQueryHandler(lb_policy_view_callback, pattern="^lb_policy_view\|"))
-    application.add_handler(CallbackQueryHandler(lb_policy_edit_callback, pattern="^lb_policy_edit\|"))
-    application.add_handler(CallbackQueryHandler(lb_policy_add_start_callback, pattern="^lb_policy_add_start$"))
-    application.add_handler(CallbackQueryHandler(lb_policy_delete_callback, pattern="^lb_policy_delete\|"))
-    application.add_handler(CallbackQueryHandler(lb_policy_delete_confirm_callback, pattern="^lb_policy_delete_confirm\|"))
-    application.add_handler(CallbackQueryHandler(lb_policy_edit_field_callback, pattern="^lb_policy_edit_field\|"))
-    application.add_handler(CallbackQueryHandler(lb_policy_toggle_callback, pattern="^lb_policy_toggle\|"))
-    application.add_handler(CallbackQueryHandler(lb_policy_set_account_callback, pattern="^lb_policy_set_account\|"))
-    application.add_handler(CallbackQueryHandler(lb_policy_set_zone_callback, pattern="^lb_policy_set_zone\|"))
-    application.add_handler(CallbackQueryHandler(lb_policy_change_algo_callback, pattern="^lb_policy_change_algo\|"))
-    application.add_handler(CallbackQueryHandler(policy_add_select_group_callback, pattern="^policy_add_select_group\|"))
-    application.add_handler(CallbackQueryHandler(lb_ip_list_menu, pattern="^lb_ip_list_menu$"))
-    application.add_handler(CallbackQueryHandler(lb_ip_edit_menu, pattern="^lb_ip_select\|"))
-    application.add_handler(CallbackQueryHandler(lb_ip_edit_start_callback, pattern="^lb_ip_edit_start\|"))
-    application.add_handler(CallbackQueryHandler(lb_ip_delete_prompt_callback, pattern="^lb_ip_delete_prompt\|"))
-    application.add_handler(CallbackQueryHandler(lb_ip_delete_confirm_callback, pattern="^lb_ip_delete_confirm\|"))
-    application.add_handler(CallbackQueryHandler(lb_ip_add_start_callback, pattern="^lb_ip_add_start$"))
-    application.add_handler(CallbackQueryHandler(lb_ip_toggle_enable_callback, pattern="^lb_ip_toggle_enable$"))
-    application.add_handler(CallbackQueryHandler(lb_add_item_manual_callback, pattern="^lb_add_item_manual$"))
-    application.add_handler(CallbackQueryHandler(lb_add_item_list_start_account_callback, pattern="^lb_add_item_list_start_account$"))
-    application.add_handler(CallbackQueryHandler(lb_add_item_list_select_account_callback, pattern="^lb_add_item_list_select_account\|"))
-    application.add_handler(CallbackQueryHandler(lb_add_item_list_select_zone_callback, pattern="^lb_add_item_list_select_zone\|"))
-    application.add_handler(CallbackQueryHandler(lb_add_item_list_toggle_record_callback, pattern="^lb_add_item_list_toggle_record\|"))
-    application.add_handler(CallbackQueryHandler(lb_add_item_list_confirm_callback, pattern="^lb_add_item_list_confirm$"))
-    application.add_handler(CallbackQueryHandler(lb_edit_item_manual_callback, pattern="^lb_edit_item_manual$"))
-    application.add_handler(CallbackQueryHandler(add_policy_lb_manual_callback, pattern="^add_policy_lb_manual$"))
-    application.add_handler(CallbackQueryHandler(add_policy_lb_from_list_callback, pattern="^add_policy_lb_from_list$"))
-    application.add_handler(CallbackQueryHandler(add_policy_lb_select_records_callback, pattern="^add_policy_lb_select_records$"))
-    application.add_handler(CallbackQueryHandler(confirm_pool_selection_callback, pattern="^confirm_pool_selection$"))
-    application.add_handler(CallbackQueryHandler(lb_force_rotate_callback, pattern="^lb_force_rotate\|"))
-
-    application.add_handler(CallbackQueryHandler(policy_force_update_nodes_callback, pattern="^policy_force_update_nodes$"))
-    application.add_handler(CallbackQueryHandler(policy_edit_nodes_start_callback, pattern="^policy_edit_nodes\|"))
-    application.add_handler(CallbackQueryHandler(policy_country_page_callback, pattern="^policy_country_page\|"))
-    application.add_handler(CallbackQueryHandler(policy_select_country_callback, pattern="^policy_select_country\|"))
-    application.add_handler(CallbackQueryHandler(policy_nodes_page_callback, pattern="^policy_nodes_page\|"))
-    application.add_handler(CallbackQueryHandler(policy_toggle_node_callback, pattern="^policy_toggle_node\|"))
-    application.add_handler(CallbackQueryHandler(policy_confirm_nodes_callback, pattern="^policy_confirm_nodes$"))
-    application.add_handler(CallbackQueryHandler(policy_nodes_select_all_global_callback, pattern="^policy_nodes_select_all_global$"))
-    application.add_handler(CallbackQueryHandler(policy_nodes_clear_all_global_callback, pattern="^policy_nodes_clear_all_global$"))
-    application.add_handler(CallbackQueryHandler(policy_records_page_callback, pattern="^policy_records_page\|"))
-    application.add_handler(CallbackQueryHandler(policy_select_record_callback, pattern="^policy_select_record\|"))
-    application.add_handler(CallbackQueryHandler(policy_confirm_records_callback, pattern="^policy_confirm_records$"))
-    application.add_handler(CallbackQueryHandler(policy_set_failback_callback, pattern="^policy_set_failback\|"))
-
-    application.add_handler(CallbackQueryHandler(settings_backup_menu_callback, pattern="^settings_backup_menu$"))
-    application.add_handler(CallbackQueryHandler(settings_export_callback, pattern="^settings_export$"))
-    application.add_handler(CallbackQueryHandler(settings_import_start_callback, pattern="^settings_import_start\|"))
-    application.add_handler(CallbackQueryHandler(settings_import_apply_callback, pattern="^settings_import_apply\|"))
+    route_callback("status_refresh", status_refresh_callback)
+    route_callback("status_select_policy|", status_select_policy_callback)
+    route_callback("manual_check|", manual_health_check_callback)
+    route_callback("show_policy_log|", show_policy_log_callback)
+    route_callback("clone_policy_start|", clone_policy_start_callback)
+
+    route_callback("monitors_menu", monitors_menu_callback)
+    route_callback("monitor_add_start", monitor_add_start_callback)
+    route_callback("monitor_delete_confirm|", monitor_delete_confirm_callback)
+    route_callback("monitor_delete_execute|", monitor_delete_execute_callback)
+    route_callback("monitor_edit|", monitor_edit_menu_callback)
+    route_callback("monitor_edit_field|", monitor_edit_field_callback)
+    route_callback("monitor_toggle|", monitor_toggle_enabled_callback)
+    route_callback("groups_menu", groups_menu_callback)
+    route_callback("group_add_start", group_add_start_callback)
+    route_callback("group_delete_confirm|", group_delete_confirm_callback)
+    route_callback("group_delete_execute|", group_delete_execute_callback)
+    route_callback("group_edit_start|", group_edit_start_callback)
+    route_callback("monitor_select_group|", monitor_select_group_callback)
+    route_callback("monitor_change_group_start|", monitor_change_group_start_callback)
+    route_callback("monitor_change_group_execute|", monitor_change_group_execute_callback)
+    route_callback("policy_change_group_start|", policy_change_group_start_callback)
+    route_callback("policy_change_group_execute|", policy_change_group_execute_callback)
+    route_callback("monitor_purge_logs|", monitor_purge_old_ip_logs_callback)
+
+    route_callback("toggle_maintenance|", toggle_maintenance_callback)
+
+    route_callback("wizard_select_account|", wizard_select_account_callback)
+    route_callback("wizard_select_zone|", wizard_select_zone_callback)
+    route_callback("wizard_set_monitoring|", wizard_set_monitoring_callback)
+    route_callback("wizard_start", wizard_start_callback)
+    route_callback("wizard_set_type|", wizard_set_type_callback)
+    route_callback("wizard_cancel", wizard_cancel_callback)
+    route_callback("wizard_lb_add_manual", wizard_lb_add_manual_callback)
+
+    route_callback("bulk_start", bulk_start_callback)
+    route_callback("bulk_cancel", bulk_cancel_callback)
+    route_callback("bulk_select_all|", bulk_select_all_callback)
+    route_callback("bulk_select|", bulk_select_callback)
+    route_callback("bulk_delete_confirm", bulk_delete_confirm_callback)
+    route_callback("bulk_delete_execute", bulk_delete_execute_callback)
+    route_callback("bulk_change_ip_start", bulk_change_ip_start_callback)
+    route_callback("bulk_change_ip_execute", bulk_change_ip_execute_callback)
+
+    route_callback("set_lang|", set_lang_callback)
+    route_callback("go_to_settings", go_to_settings_callback)
+    route_callback("back_to_settings_main", back_to_settings_main_callback)
+    route_callback("health_interval_menu", health_interval_menu_callback)
+    route_callback("health_interval_set|", health_interval_set_callback)
+    route_callback("health_interval_custom_start", health_interval_custom_start_callback)
+    route_callback("go_to_settings_from_alert", go_to_settings_from_alert_callback)
+    route_callback("go_to_main_list", go_to_main_list_callback)
+    route_callback("go_to_settings_from_startup", go_to_settings_from_startup_callback)
+    route_callback("sync_now", sync_now_callback)
+    route_callback("reporting_menu", reporting_menu_callback)
+    route_callback("report_generate|", generate_report_callback)
+
+    route_callback("settings_notifications", show_settings_notifications_menu)
+    route_callback("notification_edit_recipients|", notification_edit_recipients_callback)
+    route_callback("notification_add_member_start", notification_add_member_start_callback)
+    route_callback("notification_remove_member_start", notification_remove_member_start_callback)
+    route_callback("notification_remove_member_execute|", notification_remove_member_execute_callback)
+    route_callback("toggle_notifications", toggle_notifications_callback)
+    route_callback("add_recipient_start", add_recipient_start_callback)
+    route_callback("remove_recipient_start", remove_recipient_start_callback)
+    route_callback("remove_recipient_confirm|", remove_recipient_confirm_callback)
+    route_callback("user_management_menu", user_management_menu_callback)
+    route_callback("admin_add_start", admin_add_start_callback)
+    route_callback("admin_remove_start", admin_remove_start_callback)
+    route_callback("admin_remove_confirm|", admin_remove_confirm_callback)
+
+    route_callback("copy_monitoring_confirm|", copy_monitoring_confirm_callback)
+    route_callback("failover_start_backup_monitoring|", failover_start_backup_monitoring_callback)
+    route_callback("settings_failover_policies", settings_failover_policies_callback)
+    route_callback("failover_policy_view|", failover_policy_view_callback)
+    route_callback("failover_policy_edit|", failover_policy_edit_callback)
+    route_callback("failover_policy_add_start", failover_policy_add_start_callback)
+    route_callback("failover_policy_delete|", failover_policy_delete_callback)
+    route_callback("failover_policy_delete_confirm|", failover_policy_delete_confirm_callback)
+    route_callback("failover_policy_edit_field|", failover_policy_edit_field_callback)
+    route_callback("failover_policy_toggle|", failover_policy_toggle_callback)
+    route_callback("failover_policy_toggle_failback|", failover_policy_toggle_failback_callback)
+    route_callback("failover_policy_set_account|", failover_policy_set_account_callback)
+    route_callback("failover_policy_set_zone|", failover_policy_set_zone_callback)
+    route_callback("add_policy_failover_manual_primary", add_policy_failover_manual_primary_callback)
+    route_callback("add_policy_failover_from_list_primary", add_policy_failover_from_list_primary_callback)
+    route_callback("add_policy_failover_select_records", add_policy_failover_select_records_callback)
+
+    route_callback("settings_lb_policies", settings_lb_policies_callback)
+    route_callback("lb_policy_view|", lb_policy_view_callback)
+    route_callback("lb_policy_edit|", lb_policy_edit_callback)
+    route_callback("lb_policy_add_start", lb_policy_add_start_callback)
+    route_callback("lb_policy_delete|", lb_policy_delete_callback)
+    route_callback("lb_policy_delete_confirm|", lb_policy_delete_confirm_callback)
+    route_callback("lb_policy_edit_field|", lb_policy_edit_field_callback)
+    route_callback("lb_policy_toggle|", lb_policy_toggle_callback)
+    route_callback("lb_policy_set_account|", lb_policy_set_account_callback)
+    route_callback("lb_policy_set_zone|", lb_policy_set_zone_callback)
+    route_callback("policy_add_select_group|", policy_add_select_group_callback)
+    route_callback("lb_ip_list_menu", lb_ip_list_menu)
+    route_callback("lb_ip_select|", lb_ip_edit_menu)
+    route_callback("lb_ip_edit_start|", lb_ip_edit_start_callback)
+    route_callback("lb_ip_delete_prompt|", lb_ip_delete_prompt_callback)
+    route_callback("lb_ip_delete_confirm|", lb_ip_delete_confirm_callback)
+    route_callback("lb_ip_add_start", lb_ip_add_start_callback)
+    route_callback("lb_ip_toggle_enable", lb_ip_toggle_enable_callback)
+    route_callback("lb_add_item_manual", lb_add_item_manual_callback)
+    route_callback("lb_add_item_list_start_account", lb_add_item_list_start_account_callback)
+    route_callback("lb_add_item_list_select_account|", lb_add_item_list_select_account_callback)
+    route_callback("lb_add_item_list_select_zone|", lb_add_item_list_select_zone_callback)
+    route_callback("lb_add_item_list_toggle_record|", lb_add_item_list_toggle_record_callback)
+    route_callback("lb_add_item_list_confirm", lb_add_item_list_confirm_callback)
+    route_callback("lb_edit_item_manual", lb_edit_item_manual_callback)
+    route_callback("add_policy_lb_manual", add_policy_lb_manual_callback)
+    route_callback("add_policy_lb_from_list", add_policy_lb_from_list_callback)
+    route_callback("add_policy_lb_select_records", add_policy_lb_select_records_callback)
+    route_callback("confirm_pool_selection", confirm_pool_selection_callback)
+    route_callback("lb_force_rotate|", lb_force_rotate_callback)
+
+    route_callback("policy_force_update_nodes", policy_force_update_nodes_callback)
+    route_callback("policy_edit_nodes|", policy_edit_nodes_start_callback)
+    route_callback("policy_country_page|", policy_country_page_callback)
+    route_callback("policy_select_country|", policy_select_country_callback)
+    route_callback("policy_nodes_page|", policy_nodes_page_callback)
+    route_callback("policy_toggle_node|", policy_toggle_node_callback)
+    route_callback("policy_confirm_nodes", policy_confirm_nodes_callback)
+    route_callback("policy_nodes_select_all_global", policy_nodes_select_all_global_callback)
+    route_callback("policy_nodes_clear_all_global", policy_nodes_clear_all_global_callback)
+    route_callback("policy_records_page|", policy_records_page_callback)
+    route_callback("policy_select_record|", policy_select_record_callback)
+    route_callback("policy_confirm_records", policy_confirm_records_callback)
+    route_callback("policy_set_failback|", policy_set_failback_callback)
+
+    route_callback("settings_backup_menu", settings_backup_menu_callback)
+    route_callback("settings_export", settings_export_callback)
+    route_callback("settings_import_start|", settings_import_start_callback)
+    route_callback("settings_import_apply|", settings_import_apply_callback)
+
+    application.add_handler(CallbackQueryHandler(dispatch_callback_query))
 
     application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_text))
     application.add_handler(MessageHandler(filters.Document.MimeType("application/json"), handle_document))
 
-    logger.info("Bot is running...")
-    application.run_polling()
+    if WEBHOOK_URL:
+        logger.info(f"Bot is running with a webhook on port {WEBHOOK_PORT}...")
+        application.run_webhook(
+            listen=WEBHOOK_LISTEN,
+            port=WEBHOOK_PORT,
+            url_path=WEBHOOK_PATH,
+            webhook_url=f"{WEBHOOK_URL}/{WEBHOOK_PATH}",
+            secret_token=WEBHOOK_SECRET
+        )
+    else:
+        logger.info("Bot is running...")
+        application.run_polling()
 
 if __name__ == "__main__":
     main()
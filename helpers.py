@@ -1,7 +1,9 @@
 import os
 import json
+import orjson
 import html
 import logging
+from functools import lru_cache
 from telegram import Update, InlineKeyboardMarkup, InlineKeyboardButton, error
 from telegram.ext import ContextTypes
 from telegram.error import Forbidden, BadRequest
@@ -9,26 +11,54 @@ from telegram.error import Forbidden, BadRequest
 logger = logging.getLogger(__name__)
 CONFIG_FILE = "config.json"
 translations = {}
+_translation_mtimes = {}
+
+def _flatten_translations(tree: dict, prefix: str = ""):
+    for key, value in tree.items():
+        dotted_key = f"{prefix}{key}"
+        if isinstance(value, dict):
+            yield from _flatten_translations(value, f"{dotted_key}.")
+        else:
+            yield dotted_key, value
 
 def load_translations():
-    global translations
+    """
+    Loads the language files into flat {"section.key": template} tables for single-lookup access.
+    Files whose modification time has not changed since the last load are skipped.
+    Returns True when any file was (re)loaded.
+    """
+    changed = False
     for lang in ['en', 'fa']:
+        path = f'{lang}.json'
         try:
-            with open(f'{lang}.json', 'r', encoding='utf-8') as f:
-                translations[lang] = json.load(f)
+            mtime = os.path.getmtime(path)
+            if lang in translations and _translation_mtimes.get(lang) == mtime:
+                continue
+            with open(path, 'rb') as f:
+                translations[lang] = dict(_flatten_translations(orjson.loads(f.read())))
+            _translation_mtimes[lang] = mtime
+            changed = True
         except (FileNotFoundError, json.JSONDecodeError) as e:
             logger.fatal(f"FATAL: Could not load or decode {lang}.json: {e}")
             exit(1)
-    logger.info("Translation files have been loaded successfully.")
+    if changed:
+        _get_template.cache_clear()
+        logger.info("Translation files have been loaded successfully.")
+    return changed
+
+@lru_cache(maxsize=2048)
+def _get_template(lang: str, key: str):
+    return translations.get(lang, {}).get(key) or translations.get('en', {}).get(key)
 
 def get_text(key: str, lang: str, **kwargs):
+    text_template = _get_template(lang, key)
+    if text_template is None:
+        return f"Untranslated key: {key}"
+    if not kwargs:
+        return text_template
     try:
-        keys = key.split('.')
-        text_template = translations.get(lang, translations.get('en', {}))
-        for k in keys:
-            text_template = text_template[k]
         return text_template.format(**kwargs)
-    except (KeyError, AttributeError):
+    except (KeyError, IndexError, AttributeError):
         return f"Untranslated key: {key}"
 
 def get_user_lang(context: ContextTypes.DEFAULT_TYPE):